@@ -2,6 +2,7 @@
 
 from src.config import Config
 from src.bot import JournalBot
+from src.bot_host import BotHost
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -12,9 +13,12 @@ def main():
         # Load configuration
         config = Config.load()
 
-        # Create and run bot
-        bot = JournalBot(config)
-        bot.run()
+        # Host every configured tenant in this process, or a single bot
+        if config.tenants:
+            BotHost(config).run()
+        else:
+            bot = JournalBot(config)
+            bot.run()
 
     except Exception as e:
         logger.error(f"Failed to start bot: {e}")
@@ -1,5 +1,6 @@
 """Main bot class implementing the Telegram Journal Bot."""
 
+from typing import Dict, List, Optional
 from telegram.ext import (
     Application,
     CommandHandler,
@@ -7,27 +8,56 @@ from telegram.ext import (
     MessageHandler,
     filters
 )
+from telegram.request import BaseRequest
 from src.config import Config, PROMPTS
 from src.services.storage_service import StorageService
 from src.services.prompt_service import PromptService
+from src.services.blob_store import BlobStore
+from src.services.activity_index import ActivityIndex, NUDGE_REPLY
+from src.services.message_sender import MessageSender
+from src.services.import_service import ImportService
 from src.handlers.command_handlers import CommandHandlers
 from src.handlers.conversation_handlers import ConversationHandlers, RESPONDING
+from src.handlers.import_handlers import ImportHandlers, AWAITING_IMPORT
+from src.update_processor import PerUserUpdateProcessor
+from src.utils.constants import USER_CACHE_FLUSH_INTERVAL
 from src.utils.logger import get_logger
 import pytz
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
 
 logger = get_logger(__name__)
 
 class JournalBot:
     """Main bot class that sets up and runs the Telegram bot."""
 
-    def __init__(self, config: Config):
-        """Initialize the bot with configuration."""
+    def __init__(
+        self,
+        config: Config,
+        prompts: Optional[Dict[str, List[str]]] = None,
+        storage_service: Optional[StorageService] = None
+    ):
+        """
+        Initialize the bot with configuration.
+
+        Args:
+            config: Bot configuration
+            prompts: Prompts to use instead of the built-in PROMPTS
+            storage_service: Storage to use instead of one opened from config.users_file
+        """
         self.config = config
 
         # Initialize services
-        self.storage_service = StorageService(config.users_file)
-        self.prompt_service = PromptService(PROMPTS)
+        self.storage_service = storage_service or StorageService(config.users_file, config.user_cache_size)
+        self.prompt_service = PromptService(prompts or PROMPTS)
+        self.blob_store = BlobStore(config.blob_dir)
+        self.message_sender = MessageSender()
+
+        # Index of upcoming inactivity nudges, built once from stored users
+        self.activity_index = ActivityIndex(
+            reply_window=timedelta(days=config.nudge_reply_days),
+            silence_window=timedelta(days=config.nudge_silence_days)
+        )
+        self.activity_index.rebuild(self.storage_service.iter_users())
 
         # Initialize handlers
         self.command_handlers = CommandHandlers(
@@ -37,7 +67,14 @@ class JournalBot:
         )
         self.conversation_handlers = ConversationHandlers(
             self.storage_service,
-            self.prompt_service
+            self.prompt_service,
+            self.blob_store,
+            self.activity_index
+        )
+        self.import_handlers = ImportHandlers(
+            self.storage_service,
+            ImportService(self.storage_service),
+            self.activity_index
         )
         
         # Keep track of prompt types to alternate between them
@@ -57,32 +94,82 @@ class JournalBot:
                 
             logger.info(f"Starting weekly prompt job at {current_time}")
             
-            # Get all users
-            users = self.storage_service.get_all_users()
-            logger.info(f"Sending prompts to {len(users)} users")
-            
-            for user in users.values():
+            # Walk users page by page so fan-out does not copy the whole user table
+            sent = 0
+            for user_id in self.storage_service.iter_user_ids():
                 try:
                     # Get the appropriate prompt for this user based on their count
-                    prompt, prompt_type = self.prompt_service.get_next_prompt_for_user(user.id)
+                    prompt, prompt_type = self.prompt_service.get_next_prompt_for_user(user_id)
                     
                     # Indicate the category to the user
                     category_emoji = "🧠" if prompt_type == "self_awareness" else "🤝"
                     category_name = "Self-Awareness" if prompt_type == "self_awareness" else "Connections"
                     
-                    await context.bot.send_message(
-                        chat_id=user.id,
-                        text=f"🌟 Weekly Reflection Time! {category_emoji} {category_name}\n\n{prompt}\n\n"
+                    delivered = await self.message_sender.send(
+                        context.bot,
+                        user_id,
+                        f"🌟 Weekly Reflection Time! {category_emoji} {category_name}\n\n{prompt}\n\n"
                         "Take a moment to pause and reflect on this question."
                     )
-                    logger.info(f"Sent {prompt_type} prompt to user {user.id}")
+                    if delivered:
+                        sent += 1
+                        logger.info(f"Sent {prompt_type} prompt to user {user_id}")
                     
                 except Exception as e:
-                    logger.error(f"Error sending prompt to user {user.id}: {e}")
+                    logger.error(f"Error sending prompt to user {user_id}: {e}")
+
+            logger.info(f"Sent weekly prompts to {sent} users")
                     
         except Exception as e:
             logger.error(f"Error in weekly prompt job: {e}")
 
+    async def nudge_job(self, context):
+        """Job to nudge users whose reply or activity deadline has passed."""
+        try:
+            due = self.activity_index.pop_due(datetime.now())
+            if not due:
+                return
+            logger.info(f"Sending inactivity nudges to {len(due)} users")
+
+            nudged = 0
+            nudged_users = []
+            try:
+                for user_id, kind in due:
+                    try:
+                        user = self.storage_service.get_user(user_id)
+                        if not user:
+                            continue
+
+                        if kind == NUDGE_REPLY:
+                            text = (
+                                "⏰ A gentle reminder: you haven't answered your last reflection yet.\n\n"
+                                f"{user.last_prompt['text']}\n\n"
+                                "Reply whenever you're ready, or use /prompt for a new question."
+                            )
+                        else:
+                            text = (
+                                "🌱 It's been a while! Whenever you have a quiet moment, "
+                                "use /prompt for a fresh reflection question."
+                            )
+
+                        if await self.message_sender.send(context.bot, user_id, text):
+                            nudged += 1
+                        # Record the attempt even if it failed, so blocked users are not retried every tick
+                        user.last_nudge = {'type': kind, 'timestamp': datetime.now().isoformat()}
+                        nudged_users.append(user)
+                        self.activity_index.update(user)
+
+                    except Exception as e:
+                        logger.error(f"Error nudging user {user_id}: {e}")
+            finally:
+                # One write for the whole batch instead of one per user, kept
+                # even if the job is interrupted so sent nudges are not repeated
+                self.storage_service.add_users(nudged_users)
+            logger.info(f"Sent {nudged} inactivity nudges")
+
+        except Exception as e:
+            logger.error(f"Error in nudge job: {e}")
+
     def setup_handlers(self, application: Application):
         """Set up all command and conversation handlers."""
         # Create conversation handler with fallbacks to other commands
@@ -91,7 +178,7 @@ class JournalBot:
             states={
                 RESPONDING: [
                     MessageHandler(
-                        filters.TEXT & ~filters.COMMAND,
+                        (filters.TEXT & ~filters.COMMAND) | filters.VOICE | filters.PHOTO,
                         self.conversation_handlers.save_response
                     )
                 ]
@@ -105,8 +192,26 @@ class JournalBot:
             ],
         )
 
+        # Importing entries from a file sent by the user
+        import_handler = ConversationHandler(
+            entry_points=[CommandHandler('import', self.import_handlers.start_import)],
+            states={
+                AWAITING_IMPORT: [
+                    MessageHandler(filters.Document.ALL, self.import_handlers.receive_file)
+                ]
+            },
+            fallbacks=[
+                CommandHandler('cancel', self.import_handlers.cancel),
+                CommandHandler('start', self.command_handlers.start),
+                CommandHandler('history', self.command_handlers.view_history),
+                CommandHandler('timezone', self.command_handlers.set_timezone),
+                CommandHandler('help', self.command_handlers.help)
+            ],
+        )
+
         # Add handlers
         application.add_handler(conv_handler)
+        application.add_handler(import_handler)
         application.add_handler(CommandHandler('start', self.command_handlers.start))
         application.add_handler(CommandHandler('history', self.command_handlers.view_history))
         application.add_handler(CommandHandler('timezone', self.command_handlers.set_timezone))
@@ -115,34 +220,100 @@ class JournalBot:
         # Add error handler
         application.add_error_handler(self.command_handlers.handle_error)
 
-    def run(self):
-        """Run the bot."""
-        try:
-            # Create application
-            application = Application.builder().token(self.config.bot_token).build()
+    def build_application(
+        self,
+        request: Optional[BaseRequest] = None,
+        schedule_jobs: bool = True
+    ) -> Application:
+        """
+        Create the application with handlers and the prompt job registered.
 
-            # Setup handlers
-            self.setup_handlers(application)
+        Args:
+            request: HTTP request object to share with other bots in the process
+            schedule_jobs: Register the weekly prompt and nudge jobs; turned off
+                when driving the bot from tests so broadcasts do not interfere
+        """
+        # Create application
+        builder = Application.builder().token(self.config.bot_token)
+        if self.config.api_base_url:
+            # Point the bot at a self-hosted or fake Bot API server
+            builder = builder.base_url(self.config.api_base_url)
+        if self.config.api_file_url:
+            builder = builder.base_file_url(self.config.api_file_url)
+        if request:
+            builder = builder.request(request)
+        if self.config.concurrent_updates > 1:
+            # Different users are served in parallel, each user's updates in order
+            builder = builder.concurrent_updates(
+                PerUserUpdateProcessor(self.config.concurrent_updates)
+            )
+        builder = builder.post_shutdown(self.on_shutdown)
+        application = builder.build()
 
-            # Set up the Singapore timezone for the job
-            sg_tz = pytz.timezone('Asia/Singapore')
-            
-            # Setup a daily job that checks if it's the right day and time
-            job_queue = application.job_queue
-            
+        # Setup handlers
+        self.setup_handlers(application)
+
+        # Setup a daily job that checks if it's the right day and time
+        job_queue = application.job_queue
+
+        if schedule_jobs:
             # Run job every hour to check if it's time to send prompts
             job_queue.run_repeating(
                 self.weekly_prompt_job,
                 interval=3600,  # Check every hour
                 first=1  # Start 1 second after bot startup
             )
-            
+
             logger.info(f"Scheduled weekly prompt job for day {self.config.prompt_day} at {self.config.prompt_hour}:00 SG time")
 
+        # Nudge inactive users on every check interval
+        if schedule_jobs and (self.config.nudge_reply_days or self.config.nudge_silence_days):
+            job_queue.run_repeating(
+                self.nudge_job,
+                interval=self.config.check_interval,
+                first=self.config.check_interval
+            )
+
+        # Cached users changed by handlers are written back in batches
+        if self.storage_service.cache is not None:
+            job_queue.run_repeating(
+                self.flush_job,
+                interval=USER_CACHE_FLUSH_INTERVAL,
+                first=USER_CACHE_FLUSH_INTERVAL
+            )
+        return application
+
+    async def flush_job(self, context):
+        """Job to write back changed cached users."""
+        try:
+            self.storage_service.flush()
+            stats = self.storage_service.cache_stats
+            logger.debug(
+                f"User cache: {stats.size}/{stats.capacity} users, hit rate {stats.hit_rate:.1%}, "
+                f"{stats.evictions} evictions, {stats.write_backs} write-backs"
+            )
+        except Exception as e:
+            logger.error(f"Error in flush job: {e}")
+
+    async def on_shutdown(self, application: Application):
+        """
+        Write back cached users and release the media download client.
+
+        Registered as post_shutdown, which only run_polling and run_webhook
+        call; code that starts and stops the application itself calls it.
+        """
+        self.storage_service.flush()
+        await self.blob_store.close()
+
+    def run(self):
+        """Run the bot."""
+        try:
+            application = self.build_application()
+
             # Start polling
             logger.info("Starting bot...")
             application.run_polling()
 
         except Exception as e:
             logger.error(f"Error running bot: {e}")
-            raise
\ No newline at end of file
+            raise
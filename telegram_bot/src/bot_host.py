@@ -0,0 +1,135 @@
+"""Host several journal bots on one event loop."""
+
+import asyncio
+import dataclasses
+import signal
+from contextlib import AsyncExitStack
+from typing import List, Optional, Tuple
+from telegram.ext import Application
+from telegram.request import BaseRequest, HTTPXRequest, RequestData
+from src.bot import JournalBot
+from src.config import Config, TenantConfig
+from src.services.storage_service import StorageEngine
+from src.utils.logger import get_logger, set_log_tenant
+
+logger = get_logger(__name__)
+
+class SharedRequest(BaseRequest):
+    """
+    A request object handed to each bot in place of the shared pool.
+
+    Every Bot initializes and shuts down its request; these calls do nothing
+    here, so one bot stopping cannot close the pool while others still use it.
+    The host manages the pool itself.
+    """
+
+    def __init__(self, request: BaseRequest):
+        """Wrap the request that actually sends the API calls."""
+        self.request = request
+
+    @property
+    def read_timeout(self) -> Optional[float]:
+        return self.request.read_timeout
+
+    async def initialize(self) -> None:
+        """The host initializes the shared pool."""
+
+    async def shutdown(self) -> None:
+        """The host shuts down the shared pool once every bot has stopped."""
+
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: Optional[RequestData] = None,
+        read_timeout=BaseRequest.DEFAULT_NONE,
+        write_timeout=BaseRequest.DEFAULT_NONE,
+        connect_timeout=BaseRequest.DEFAULT_NONE,
+        pool_timeout=BaseRequest.DEFAULT_NONE
+    ) -> Tuple[int, bytes]:
+        return await self.request.do_request(
+            url,
+            method,
+            request_data=request_data,
+            read_timeout=read_timeout,
+            write_timeout=write_timeout,
+            connect_timeout=connect_timeout,
+            pool_timeout=pool_timeout
+        )
+
+class BotHost:
+    """Runs one Application per tenant, sharing the connection pool and storage engine."""
+
+    def __init__(self, config: Config):
+        """Initialize the host with a configuration that lists tenants."""
+        if not config.tenants:
+            raise ValueError("BotHost needs at least one tenant in the configuration")
+
+        self.config = config
+        self.storage_engine = StorageEngine()
+        # Outgoing API calls of all bots share one pool; each bot keeps its
+        # own getUpdates connection so long polls do not block sends
+        self.request = HTTPXRequest(connection_pool_size=config.http_pool_size)
+        self.shared_request = SharedRequest(self.request)
+        self.bots = [self._create_bot(tenant) for tenant in config.tenants]
+        self.applications: List[Application] = []
+
+    def _create_bot(self, tenant: TenantConfig) -> JournalBot:
+        """Create the bot for a tenant."""
+        tenant_config = dataclasses.replace(
+            self.config,
+            bot_token=tenant.bot_token,
+            users_file=tenant.users_file,
+            tenants=[]
+        )
+        storage = self.storage_engine.namespace(tenant.name, tenant.users_file, self.config.user_cache_size)
+        return JournalBot(tenant_config, prompts=tenant.prompts, storage_service=storage)
+
+    async def serve(self, stop_event: asyncio.Event):
+        """Start every bot and keep polling until ``stop_event`` is set."""
+        async with AsyncExitStack() as stack:
+            # Registered first so the pool is closed only after every bot has stopped
+            await self.request.initialize()
+            stack.push_async_callback(self.request.shutdown)
+            for tenant, bot in zip(self.config.tenants, self.bots):
+                # Tasks started below copy this context, so their log records name the tenant
+                set_log_tenant(tenant.name)
+                application = bot.build_application(request=self.shared_request)
+                # post_shutdown only runs under run_polling, so call it after the application shuts down
+                stack.push_async_callback(bot.on_shutdown, application)
+                await stack.enter_async_context(application)
+                await application.start()
+                stack.push_async_callback(application.stop)
+                await application.updater.start_polling()
+                stack.push_async_callback(application.updater.stop)
+                self.applications.append(application)
+                logger.info(f"Started bot for tenant {tenant.name}")
+                set_log_tenant(None)
+
+            logger.info(f"Hosting {len(self.applications)} bots")
+            await stop_event.wait()
+            logger.info("Stopping bots...")
+
+        self.storage_engine.save_all()
+
+    async def _run(self):
+        """Serve until SIGTERM or SIGINT."""
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop_event.set)
+            except (NotImplementedError, RuntimeError):
+                # Signal handlers are not available on Windows event loops
+                pass
+        await self.serve(stop_event)
+
+    def run(self):
+        """Run all hosted bots."""
+        try:
+            asyncio.run(self._run())
+        except KeyboardInterrupt:
+            pass
+        except Exception as e:
+            logger.error(f"Error running bots: {e}")
+            raise
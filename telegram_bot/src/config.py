@@ -1,13 +1,56 @@
 """Configuration management for the Telegram Journal Bot."""
 
+import json
 import os
 from dotenv import load_dotenv
-from dataclasses import dataclass
-from typing import Dict, List
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from src.utils.constants import DEFAULT_BLOB_DIR
 
 # Hard-coded timezone for Singapore
 SINGAPORE_TIMEZONE = "Asia/Singapore"
 
+@dataclass
+class TenantConfig:
+    """Configuration for one of several bots hosted in a single process."""
+    name: str
+    bot_token: str
+    users_file: str
+    prompts: Dict[str, List[str]]
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TenantConfig':
+        """
+        Create a TenantConfig from an entry of the tenants file.
+
+        The token is read from ``bot_token`` or from the environment variable
+        named by ``bot_token_env``. Prompts default to the built-in PROMPTS.
+        """
+        name = data.get('name')
+        if not name:
+            raise ValueError("Every tenant needs a name")
+
+        bot_token = data.get('bot_token') or os.getenv(data.get('bot_token_env', ''), '')
+        if not bot_token:
+            raise ValueError(f"Tenant {name} has no bot_token or bot_token_env")
+
+        return cls(
+            name=name,
+            bot_token=bot_token,
+            users_file=data.get('users_file', f"data/{name}/users.json"),
+            prompts=data.get('prompts', PROMPTS)
+        )
+
+def load_tenants(file_path: str) -> List[TenantConfig]:
+    """Load the list of tenants from a JSON file."""
+    with open(file_path, 'r') as f:
+        tenants = [TenantConfig.from_dict(entry) for entry in json.load(f)]
+
+    names = [tenant.name for tenant in tenants]
+    if len(set(names)) != len(names):
+        raise ValueError("Tenant names must be unique")
+    return tenants
+
 @dataclass
 class Config:
     """Configuration container for the bot."""
@@ -18,15 +61,27 @@ class Config:
     prompt_day: int
     max_history: int
     timezone: str = SINGAPORE_TIMEZONE  # Always set to Singapore timezone
+    api_base_url: Optional[str] = None  # Defaults to https://api.telegram.org/bot
+    tenants: List[TenantConfig] = field(default_factory=list)  # Set when hosting several bots
+    http_pool_size: int = 64  # Connections shared by all hosted bots
+    api_file_url: Optional[str] = None  # Defaults to https://api.telegram.org/file/bot
+    blob_dir: str = DEFAULT_BLOB_DIR  # Content-addressed store for voice notes and photos
+    nudge_reply_days: int = 3  # Remind unanswered prompts after this many days, 0 disables
+    nudge_silence_days: int = 21  # Re-engage users silent this long, 0 disables
+    concurrent_updates: int = 64  # Updates handled at once, 1 processes them sequentially
+    user_cache_size: int = 0  # Users kept in memory with an SQLite users file, 0 keeps all
 
     @classmethod
     def load(cls) -> 'Config':
         """Load configuration from environment variables."""
         load_dotenv()
-        
-        bot_token = os.getenv('BOT_TOKEN')
-        if not bot_token:
-            raise ValueError("BOT_TOKEN environment variable is required")
+
+        tenants_file = os.getenv('TENANTS_FILE')
+        tenants = load_tenants(tenants_file) if tenants_file else []
+
+        bot_token = os.getenv('BOT_TOKEN', '')
+        if not bot_token and not tenants:
+            raise ValueError("BOT_TOKEN or TENANTS_FILE environment variable is required")
             
         return cls(
             bot_token=bot_token,
@@ -35,7 +90,16 @@ class Config:
             prompt_hour=int(os.getenv('PROMPT_HOUR', '9')),
             prompt_day=int(os.getenv('PROMPT_DAY', '0')),  # Monday
             max_history=int(os.getenv('MAX_HISTORY', '5')),
-            timezone=SINGAPORE_TIMEZONE  # Always use Singapore timezone
+            timezone=SINGAPORE_TIMEZONE,  # Always use Singapore timezone
+            api_base_url=os.getenv('BOT_API_BASE_URL') or None,
+            tenants=tenants,
+            http_pool_size=int(os.getenv('HTTP_POOL_SIZE', '64')),
+            api_file_url=os.getenv('BOT_API_FILE_URL') or None,
+            blob_dir=os.getenv('BLOB_DIR', DEFAULT_BLOB_DIR),
+            nudge_reply_days=int(os.getenv('NUDGE_REPLY_DAYS', '3')),
+            nudge_silence_days=int(os.getenv('NUDGE_SILENCE_DAYS', '21')),
+            concurrent_updates=int(os.getenv('CONCURRENT_UPDATES', '64')),
+            user_cache_size=int(os.getenv('USER_CACHE_SIZE', '0'))
         )
 
 PROMPTS = {
@@ -58,6 +58,7 @@ class CommandHandlers:
             "Commands:\n"
             "/prompt - Get a new reflection prompt\n"
             "/history - View your recent journal entries\n"
+            "/import - Import entries from another journaling app\n"
             "/timezone - Check prompt timings\n"
             "/help - shows all available commands\n\n"
             "Let's start your journaling journey! Use /prompt to get your first question."
@@ -97,7 +98,11 @@ class CommandHandlers:
                 date = datetime.fromisoformat(entry.timestamp).strftime('%Y-%m-%d %H:%M')
                 history_text += f"📅 {date}\n"
                 history_text += f"Q: {entry.prompt}\n"
-                history_text += f"A: {entry.response}\n\n"
+                if entry.media:
+                    label = "🎤 Voice note" if entry.media.kind == 'voice' else "📷 Photo"
+                    history_text += f"A: {label} {entry.response}\n\n"
+                else:
+                    history_text += f"A: {entry.response}\n\n"
 
             # Split message if it's too long
             if len(history_text) > 4000:
@@ -107,6 +112,16 @@ class CommandHandlers:
             else:
                 await update.message.reply_text(history_text)
 
+            # Re-send media by its cached file_id so nothing is uploaded again
+            for entry in recent_entries:
+                if not entry.media:
+                    continue
+                date = datetime.fromisoformat(entry.timestamp).strftime('%Y-%m-%d %H:%M')
+                if entry.media.kind == 'voice':
+                    await update.message.reply_voice(voice=entry.media.file_id, caption=f"📅 {date}")
+                else:
+                    await update.message.reply_photo(photo=entry.media.file_id, caption=f"📅 {date}")
+
         except Exception as e:
             logger.error(f"Error displaying history for user {user_id}: {e}")
             await update.message.reply_text(
@@ -135,6 +150,7 @@ class CommandHandlers:
             "• /start - Initialize the bot and get started\n"
             "• /prompt - Get a new reflection prompt\n"
             "• /history - View your recent journal entries\n"
+            "• /import - Import entries from a CSV, JSON Lines or JSON file\n"
             "• /help - Show this help message\n\n"
             "📝 How to use:\n"
             "1. Use /start to begin\n"
@@ -3,6 +3,10 @@
 from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler
 from datetime import datetime
+from typing import Optional
+from src.models.user import MediaRef
+from src.services.activity_index import ActivityIndex
+from src.services.blob_store import BlobStore
 from src.services.storage_service import StorageService
 from src.services.prompt_service import PromptService
 from src.utils.logger import get_logger
@@ -15,10 +19,18 @@ RESPONDING = 1
 class ConversationHandlers:
     """Handlers for bot conversations."""
 
-    def __init__(self, storage_service: StorageService, prompt_service: PromptService):
+    def __init__(
+        self,
+        storage_service: StorageService,
+        prompt_service: PromptService,
+        blob_store: Optional[BlobStore] = None,
+        activity_index: Optional[ActivityIndex] = None
+    ):
         """Initialize conversation handlers with required services."""
         self.storage = storage_service
         self.prompt_service = prompt_service
+        self.blob_store = blob_store
+        self.activity_index = activity_index
 
     async def send_prompt(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Send a new prompt to the user and await response."""
@@ -43,6 +55,8 @@ class ConversationHandlers:
                 'timestamp': datetime.now().isoformat()
             }
             self.storage.add_user(user)
+            if self.activity_index:
+                self.activity_index.update(user)
             
             # Indicate the category to the user
             category_emoji = "🧠" if prompt_type == "self_awareness" else "🤝"
@@ -76,14 +90,20 @@ class ConversationHandlers:
                 )
                 return ConversationHandler.END
 
+            # Voice notes and photos are stored as blobs, with the caption as text
+            media = await self._store_media(update, context)
+
             # Create and save journal entry
             entry = self.prompt_service.create_journal_entry(
                 prompt=user.last_prompt['text'],
-                response=update.message.text,
-                prompt_type=user.last_prompt['type']
+                response=update.message.text or update.message.caption or '',
+                prompt_type=user.last_prompt['type'],
+                media=media
             )
             user.add_response(entry)
             self.storage.add_user(user)
+            if self.activity_index:
+                self.activity_index.update(user)
 
             # Give feedback based on the prompt type
             if user.last_prompt['type'] == 'self_awareness':
@@ -108,4 +128,23 @@ class ConversationHandlers:
                 "Please try using /prompt to start again."
             )
 
-        return ConversationHandler.END
\ No newline at end of file
+        return ConversationHandler.END
+
+    async def _store_media(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> Optional[MediaRef]:
+        """Download an attached voice note or photo into the blob store."""
+        message = update.message
+        if message.voice:
+            kind, attachment = 'voice', message.voice
+        elif message.photo:
+            # Photos come in several sizes, the last one is the largest
+            kind, attachment = 'photo', message.photo[-1]
+        else:
+            return None
+
+        if not self.blob_store:
+            raise RuntimeError("Received media but no blob store is configured")
+
+        file = await context.bot.get_file(attachment.file_id)
+        digest, size = await self.blob_store.save_telegram_file(file)
+        logger.info(f"Stored {kind} from user {update.effective_user.id} as blob {digest}")
+        return MediaRef(kind=kind, sha256=digest, file_id=attachment.file_id, size=size)
\ No newline at end of file
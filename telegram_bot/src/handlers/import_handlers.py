@@ -0,0 +1,101 @@
+"""Handlers for importing journal entries from a file sent to the bot."""
+
+import asyncio
+import os
+import tempfile
+from telegram import Update
+from telegram.ext import ContextTypes, ConversationHandler
+from typing import Optional
+from src.services.activity_index import ActivityIndex
+from src.services.import_service import ImportResult, ImportService
+from src.services.storage_service import StorageService
+from src.utils.constants import IMPORT_MAX_FILE_SIZE
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Conversation states
+AWAITING_IMPORT = 2
+
+IMPORT_EXTENSIONS = ('.csv', '.jsonl', '.json')
+
+class ImportHandlers:
+    """Handlers for the /import conversation."""
+
+    def __init__(
+        self,
+        storage_service: StorageService,
+        import_service: ImportService,
+        activity_index: Optional[ActivityIndex] = None
+    ):
+        """Initialize import handlers with required services."""
+        self.storage = storage_service
+        self.import_service = import_service
+        self.activity_index = activity_index
+
+    async def start_import(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Ask the user for the file to import."""
+        user_id = str(update.effective_user.id)
+        if not self.storage.get_user(user_id):
+            await update.message.reply_text("Please start the bot with /start first!")
+            return ConversationHandler.END
+
+        await update.message.reply_text(
+            "📥 Send me a CSV, JSON Lines or JSON file with your past entries.\n\n"
+            "Each row needs a timestamp (ISO 8601) and a response; "
+            "prompt and prompt_type are optional.\n\n"
+            "Use /cancel to stop."
+        )
+        return AWAITING_IMPORT
+
+    async def receive_file(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Download the file and import its entries into the user's journal."""
+        user_id = str(update.effective_user.id)
+        document = update.message.document
+        extension = os.path.splitext(document.file_name or '')[1].lower()
+
+        if extension not in IMPORT_EXTENSIONS:
+            await update.message.reply_text("Please send a .csv, .jsonl or .json file, or /cancel.")
+            return AWAITING_IMPORT
+        if document.file_size and document.file_size > IMPORT_MAX_FILE_SIZE:
+            await update.message.reply_text(
+                f"That file is too large. The limit is {IMPORT_MAX_FILE_SIZE // (1024 * 1024)}MB."
+            )
+            return ConversationHandler.END
+
+        fd, path = tempfile.mkstemp(suffix=extension)
+        os.close(fd)
+        try:
+            telegram_file = await context.bot.get_file(document.file_id)
+            await telegram_file.download_to_drive(path)
+            # Parsing blocks, so keep it off the event loop; the batches are
+            # merged into the live User here, where its other handlers run
+            result = ImportResult()
+            batches = await asyncio.to_thread(
+                lambda: list(self.import_service.iter_batches(path, result, user_id))
+            )
+            for batch in batches:
+                self.import_service.commit(batch, result)
+        except Exception as e:
+            logger.error(f"Error importing file for user {user_id}: {e}")
+            await update.message.reply_text("Sorry, I couldn't import that file. Please try again later.")
+            return ConversationHandler.END
+        finally:
+            os.remove(path)
+
+        if self.activity_index and result.imported:
+            self.activity_index.update(self.storage.get_user(user_id))
+
+        summary = f"✅ Imported {result.imported} entries."
+        if result.duplicates:
+            summary += f"\nSkipped {result.duplicates} entries you already have."
+        if result.invalid:
+            summary += f"\nSkipped {result.invalid} invalid rows:\n" + "\n".join(result.errors)
+        await update.message.reply_text(summary)
+        logger.info(f"User {user_id} imported {result.imported} entries")
+        return ConversationHandler.END
+
+    async def cancel(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Abandon the import."""
+        await update.message.reply_text("Import cancelled.")
+        return ConversationHandler.END
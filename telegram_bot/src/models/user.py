@@ -5,6 +5,28 @@ from typing import List, Optional, Dict
 from datetime import datetime
 from src.config import SINGAPORE_TIMEZONE
 
+@dataclass
+class MediaRef:
+    """Reference to a voice note or photo kept in the blob store."""
+    kind: str  # 'voice' or 'photo'
+    sha256: str
+    file_id: str  # Telegram file_id, reused to re-send without uploading
+    size: int
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'MediaRef':
+        """Create a MediaRef instance from a dictionary."""
+        return cls(
+            kind=data['kind'],
+            sha256=data['sha256'],
+            file_id=data['file_id'],
+            size=data.get('size', 0)
+        )
+
+    def to_dict(self) -> Dict:
+        """Convert the reference to a dictionary."""
+        return asdict(self)
+
 @dataclass
 class JournalEntry:
     """Represents a single journal entry."""
@@ -12,6 +34,7 @@ class JournalEntry:
     response: str
     timestamp: str
     prompt_type: str
+    media: Optional[MediaRef] = None
 
     @classmethod
     def from_dict(cls, data: Dict) -> 'JournalEntry':
@@ -20,12 +43,17 @@ class JournalEntry:
             prompt=data['prompt'],
             response=data['response'],
             timestamp=data['timestamp'],
-            prompt_type=data.get('prompt_type', 'unknown')
+            prompt_type=data.get('prompt_type', 'unknown'),
+            media=MediaRef.from_dict(data['media']) if data.get('media') else None
         )
 
     def to_dict(self) -> Dict:
         """Convert the entry to a dictionary."""
-        return asdict(self)
+        data = asdict(self)
+        # Text entries keep the original compact format
+        if self.media is None:
+            del data['media']
+        return data
 
 @dataclass
 class User:
@@ -34,6 +62,8 @@ class User:
     timezone: str = SINGAPORE_TIMEZONE  # Always initialized with Singapore timezone
     last_prompt: Optional[Dict] = None
     responses: List[JournalEntry] = None
+    last_nudge: Optional[Dict] = None  # Kind and time of the last inactivity nudge
+    last_import: Optional[str] = None  # Time entries were last imported, not their timestamps
 
     def __post_init__(self):
         """Initialize empty responses list if None and ensure Singapore timezone."""
@@ -53,7 +83,9 @@ class User:
             id=user_id,
             timezone=SINGAPORE_TIMEZONE,  # Always use Singapore timezone
             last_prompt=data.get('last_prompt'),
-            responses=responses
+            responses=responses,
+            last_nudge=data.get('last_nudge'),
+            last_import=data.get('last_import')
         )
 
     def to_dict(self) -> Dict:
@@ -61,7 +93,9 @@ class User:
         return {
             'timezone': SINGAPORE_TIMEZONE,  # Always save Singapore timezone
             'last_prompt': self.last_prompt,
-            'responses': [entry.to_dict() for entry in self.responses]
+            'responses': [entry.to_dict() for entry in self.responses],
+            'last_nudge': self.last_nudge,
+            'last_import': self.last_import
         }
 
     def add_response(self, entry: JournalEntry):
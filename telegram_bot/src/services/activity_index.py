@@ -0,0 +1,145 @@
+"""Index of upcoming inactivity nudges ordered by deadline."""
+
+import heapq
+import itertools
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from src.models.user import User
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Nudge kinds
+NUDGE_REPLY = 'reply'  # A prompt was sent but not answered
+NUDGE_SILENCE = 'silence'  # The user has not been active for a long time
+
+class ActivityIndex:
+    """
+    Min-heap of each user's next nudge deadline.
+
+    Every user has at most one pending nudge. Rescheduling pushes a new heap
+    entry and leaves the old one behind; stale entries are skipped when they
+    reach the top of the heap.
+    """
+
+    def __init__(self, reply_window: timedelta, silence_window: timedelta):
+        """
+        Initialize the index.
+
+        Args:
+            reply_window: Time after a prompt before reminding the user to reply,
+                zero disables reply nudges
+            silence_window: Time without activity before re-engaging the user,
+                zero disables silence nudges
+        """
+        self.reply_window = reply_window
+        self.silence_window = silence_window
+        self._heap: List[Tuple[datetime, int, str, str]] = []
+        self._pending: Dict[str, Tuple[datetime, str]] = {}
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        """Number of users with a pending nudge."""
+        return len(self._pending)
+
+    def next_nudge(self, user: User) -> Optional[Tuple[datetime, str]]:
+        """
+        Work out when and why a user should next be nudged.
+
+        Uses only the last prompt, the last response, the last import and the
+        last nudge, so it does not depend on the length of the user's history.
+        Imported entries carry their original, possibly years old, timestamps,
+        so an import counts as activity at the time it happened instead.
+
+        Returns:
+            Tuple containing (deadline, kind), or None if no nudge is due
+        """
+        prompted_at = datetime.fromisoformat(user.last_prompt['timestamp']) if user.last_prompt else None
+        responded_at = datetime.fromisoformat(user.responses[-1].timestamp) if user.responses else None
+        imported_at = datetime.fromisoformat(user.last_import) if user.last_import else None
+        nudged_at = datetime.fromisoformat(user.last_nudge['timestamp']) if user.last_nudge else None
+        nudge_kind = user.last_nudge['type'] if user.last_nudge else None
+
+        if prompted_at and (responded_at is None or prompted_at > responded_at):
+            # Waiting for a reply: remind once, then fall back to a silence nudge
+            if nudged_at is None or nudged_at < prompted_at:
+                if self.reply_window:
+                    return prompted_at + self.reply_window, NUDGE_REPLY
+                return self._silence_deadline(prompted_at)
+            if nudge_kind == NUDGE_REPLY:
+                return self._silence_deadline(prompted_at)
+            return None
+
+        active_at = max((t for t in (responded_at, imported_at) if t), default=None)
+        if active_at and (nudged_at is None or nudged_at < active_at):
+            return self._silence_deadline(active_at)
+        return None
+
+    def _silence_deadline(self, last_activity: datetime) -> Optional[Tuple[datetime, str]]:
+        if not self.silence_window:
+            return None
+        return last_activity + self.silence_window, NUDGE_SILENCE
+
+    def update(self, user: User):
+        """Reschedule a user after a prompt, response or nudge."""
+        nudge = self.next_nudge(user)
+        if nudge is None:
+            self._pending.pop(user.id, None)
+            return
+        if self._pending.get(user.id) == nudge:
+            return
+
+        self._pending[user.id] = nudge
+        deadline, kind = nudge
+        heapq.heappush(self._heap, (deadline, next(self._sequence), user.id, kind))
+
+        # Drop stale entries once they outnumber the live ones
+        if len(self._heap) > 2 * len(self._pending) + 1024:
+            self._compact()
+
+    def remove(self, user_id: str):
+        """Forget a user's pending nudge."""
+        self._pending.pop(user_id, None)
+
+    def rebuild(self, users: Iterable[User]):
+        """Build the index from scratch, e.g. at startup."""
+        self._heap = []
+        self._pending = {}
+        for user in users:
+            try:
+                nudge = self.next_nudge(user)
+            except (ValueError, KeyError, TypeError) as e:
+                logger.error(f"Cannot schedule nudges for user {user.id}: {e}")
+                continue
+            if nudge:
+                self._pending[user.id] = nudge
+        self._compact()
+        logger.info(f"Activity index holds {len(self._pending)} pending nudges")
+
+    def pop_due(self, now: datetime, limit: Optional[int] = None) -> List[Tuple[str, str]]:
+        """
+        Remove and return the users whose nudge is due.
+
+        Args:
+            now: Current time
+            limit: Maximum number of users to return
+
+        Returns:
+            List of (user_id, kind) tuples, earliest deadline first
+        """
+        due = []
+        while self._heap and self._heap[0][0] <= now and (limit is None or len(due) < limit):
+            deadline, _, user_id, kind = heapq.heappop(self._heap)
+            if self._pending.get(user_id) != (deadline, kind):
+                continue  # Rescheduled since this entry was pushed
+            del self._pending[user_id]
+            due.append((user_id, kind))
+        return due
+
+    def _compact(self):
+        """Rebuild the heap from the pending nudges only."""
+        self._heap = [
+            (deadline, next(self._sequence), user_id, kind)
+            for user_id, (deadline, kind) in self._pending.items()
+        ]
+        heapq.heapify(self._heap)
@@ -0,0 +1,97 @@
+"""Content-addressed storage for media attached to journal entries."""
+
+import hashlib
+import os
+import tempfile
+from typing import Optional, Tuple
+import httpx
+from telegram import File
+from src.utils.constants import BLOB_CHUNK_SIZE
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class BlobStore:
+    """Stores files on disk under their SHA-256, keeping one copy per content."""
+
+    def __init__(self, root_dir: str, chunk_size: int = BLOB_CHUNK_SIZE):
+        """
+        Initialize the blob store.
+
+        Args:
+            root_dir: Directory that holds the blobs
+            chunk_size: Bytes read and written per chunk while streaming
+        """
+        self.root_dir = root_dir
+        self.chunk_size = chunk_size
+        self._tmp_dir = os.path.join(root_dir, 'tmp')
+        self._client: Optional[httpx.AsyncClient] = None
+        os.makedirs(self._tmp_dir, exist_ok=True)
+
+    def path_for(self, digest: str) -> str:
+        """Get the path of a blob, sharded by the first two hex digits."""
+        return os.path.join(self.root_dir, digest[:2], digest)
+
+    def exists(self, digest: str) -> bool:
+        """Check whether a blob is stored."""
+        return os.path.exists(self.path_for(digest))
+
+    async def save_telegram_file(self, file: File) -> Tuple[str, int]:
+        """
+        Download a Telegram file into the store chunk by chunk.
+
+        The file is hashed while it is written to a temporary file, which is
+        then moved into place or discarded if the content is already stored.
+
+        Returns:
+            Tuple containing (sha256_hex_digest, size_in_bytes)
+        """
+        if not file.file_path:
+            raise ValueError(f"File {file.file_id} has no file_path to download from")
+
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                if os.path.isfile(file.file_path):
+                    # Local Bot API servers hand out paths on disk
+                    with open(file.file_path, 'rb') as source:
+                        for chunk in iter(lambda: source.read(self.chunk_size), b''):
+                            digest.update(chunk)
+                            out.write(chunk)
+                            size += len(chunk)
+                else:
+                    async with self._get_client().stream('GET', file.file_path) as response:
+                        response.raise_for_status()
+                        async for chunk in response.aiter_bytes(self.chunk_size):
+                            digest.update(chunk)
+                            out.write(chunk)
+                            size += len(chunk)
+
+            hex_digest = digest.hexdigest()
+            target = self.path_for(hex_digest)
+            if os.path.exists(target):
+                logger.info(f"Blob {hex_digest} already stored, skipping duplicate")
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(tmp_path, target)
+            return hex_digest, size
+
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the HTTP client used for downloads, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=httpx.Timeout(30.0))
+        return self._client
+
+    async def close(self):
+        """Close the download client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
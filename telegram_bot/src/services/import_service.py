@@ -0,0 +1,287 @@
+"""Import of journal entries exported from other journaling apps."""
+
+import csv
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set, TextIO, Tuple
+from src.models.user import JournalEntry, User
+from src.services.storage_service import StorageService
+from src.utils.constants import (
+    IMPORT_BATCH_SIZE,
+    IMPORT_MAX_RESPONSE_LENGTH,
+    IMPORT_MAX_ROW_SIZE,
+    USER_FILE_CHUNK_SIZE
+)
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+IMPORTED_PROMPT = "Imported entry"
+IMPORTED_TYPE = "imported"
+MAX_REPORTED_ERRORS = 5
+_DECODER = json.JSONDecoder()
+
+# New entries of an import per user ID
+ImportBatch = Dict[str, List[JournalEntry]]
+
+@dataclass
+class ImportResult:
+    """Outcome of an import."""
+    imported: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    writes: int = 0
+    user_ids: Set[str] = field(default_factory=set)
+    errors: List[str] = field(default_factory=list)
+
+    def add_error(self, location: str, reason: str):
+        """Count an invalid row, keeping the first few messages."""
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"{location}: {reason}")
+
+def _iter_json_array(f: TextIO, chunk_size: int = USER_FILE_CHUNK_SIZE) -> Iterator[Tuple[str, Dict]]:
+    """
+    Yield the items of a top-level JSON array one at a time.
+
+    The file is read in chunks and each item is decoded with ``raw_decode``
+    once it is complete, so only one item is held in memory. A malformed item
+    cannot be skipped reliably, so it ends the import with an error.
+    """
+    buffer = f.read(chunk_size)
+    position = len(buffer) - len(buffer.lstrip())
+    if buffer[position:position + 1] != '[':
+        yield "file", {'__error__': "file is not a JSON array"}
+        return
+    position += 1
+    index = 0
+    eof = False
+
+    while True:
+        # Skip separators, reading on if the chunk ran out
+        while True:
+            while position < len(buffer) and (buffer[position].isspace() or buffer[position] == ','):
+                position += 1
+            if position < len(buffer) or eof:
+                break
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer, position = buffer[position:] + chunk, 0
+
+        if position >= len(buffer):
+            yield "file", {'__error__': "unexpected end of file"}
+            return
+        if buffer[position] == ']':
+            return
+
+        try:
+            row, position = _DECODER.raw_decode(buffer, position)
+        except ValueError as e:
+            # The item may only be cut off by the end of the chunk
+            if eof or len(buffer) - position > IMPORT_MAX_ROW_SIZE:
+                yield f"item {index + 1}", {'__error__': f"invalid JSON: {e}"}
+                return
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        index += 1
+        yield f"item {index}", row if isinstance(row, dict) else {'__error__': "not an object"}
+
+def iter_import_rows(file_path: str) -> Iterator[Tuple[str, Dict]]:
+    """
+    Stream rows from a CSV, JSON Lines or JSON array file.
+
+    The format is chosen by extension: .csv files need a header row, .json
+    files hold one array of objects, anything else is read as JSON Lines.
+
+    Yields:
+        Tuples of (location, row)
+    """
+    with open(file_path, 'r', encoding='utf-8-sig', errors='replace', newline='') as f:
+        if os.path.splitext(file_path)[1].lower() == '.csv':
+            reader = csv.DictReader(f)
+            while True:
+                try:
+                    row = next(reader)
+                except StopIteration:
+                    break
+                except csv.Error as e:
+                    # The reader resumes at the next line, e.g. after an oversized
+                    # field; DictReader only updates its line_num for good rows
+                    yield f"line {reader.reader.line_num}", {'__error__': f"invalid CSV: {e}"}
+                    continue
+                yield f"line {reader.line_num}", row
+        elif os.path.splitext(file_path)[1].lower() == '.json':
+            yield from _iter_json_array(f)
+        else:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield f"line {line_number}", {'__error__': f"invalid JSON: {e}"}
+                    continue
+                yield f"line {line_number}", row if isinstance(row, dict) else {'__error__': "not an object"}
+
+def _entry_time(entry: JournalEntry) -> datetime:
+    return datetime.fromisoformat(entry.timestamp)
+
+def parse_import_entry(row: Dict) -> JournalEntry:
+    """Validate a row and turn it into a journal entry, raising ValueError if invalid."""
+    if '__error__' in row:
+        raise ValueError(row['__error__'])
+
+    response = row.get('response')
+    if not isinstance(response, str) or not response.strip():
+        raise ValueError("response is missing")
+    if len(response) > IMPORT_MAX_RESPONSE_LENGTH:
+        raise ValueError(f"response longer than {IMPORT_MAX_RESPONSE_LENGTH} characters")
+
+    raw_timestamp = row.get('timestamp')
+    if not isinstance(raw_timestamp, str) or not raw_timestamp.strip():
+        raise ValueError("timestamp is missing")
+    try:
+        timestamp = datetime.fromisoformat(raw_timestamp.strip())
+    except ValueError:
+        raise ValueError(f"invalid timestamp {raw_timestamp!r}")
+    if timestamp.tzinfo is not None:
+        # Stored timestamps are naive local time
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+
+    return JournalEntry(
+        prompt=str(row.get('prompt') or '').strip() or IMPORTED_PROMPT,
+        response=response.strip(),
+        timestamp=timestamp.isoformat(),
+        prompt_type=str(row.get('prompt_type') or '').strip() or IMPORTED_TYPE
+    )
+
+class ImportService:
+    """Validates, de-duplicates and stores imported entries in large batches."""
+
+    def __init__(self, storage_service: StorageService, batch_size: int = IMPORT_BATCH_SIZE):
+        """
+        Initialize the import service.
+
+        Args:
+            storage_service: Storage the entries are added to
+            batch_size: Entries buffered before they are written in one save
+        """
+        self.storage = storage_service
+        self.batch_size = batch_size
+
+    def import_file(
+        self,
+        file_path: str,
+        user_id: Optional[str] = None,
+        create_users: bool = False
+    ) -> ImportResult:
+        """
+        Import every valid entry of a file.
+
+        Entries whose timestamp already exists for the user, in storage or
+        earlier in the file, are skipped as duplicates.
+
+        Args:
+            file_path: CSV, JSON Lines or JSON file
+            user_id: Import every row for this user; otherwise rows need a user_id column
+            create_users: Create users that do not exist yet
+        """
+        result = ImportResult()
+        for batch in self.iter_batches(file_path, result, user_id, create_users):
+            self.commit(batch, result)
+        logger.info(
+            f"Imported {result.imported} entries for {len(result.user_ids)} users in {result.writes} writes "
+            f"({result.duplicates} duplicates, {result.invalid} invalid)"
+        )
+        return result
+
+    def iter_batches(
+        self,
+        file_path: str,
+        result: ImportResult,
+        user_id: Optional[str] = None,
+        create_users: bool = False
+    ) -> Iterator[ImportBatch]:
+        """
+        Read, validate and de-duplicate the entries of a file without changing any user.
+
+        Invalid rows and duplicates are counted in ``result``. Stored users
+        are only read, so this can run in a worker thread while ``commit``
+        applies the batches where the users are used.
+
+        Yields:
+            Up to ``batch_size`` new entries, in time order per user ID
+        """
+        pending: ImportBatch = {}
+        pending_count = 0
+        known_timestamps: Dict[str, Set[str]] = {}
+
+        for location, row in iter_import_rows(file_path):
+            try:
+                entry = parse_import_entry(row)
+                target = user_id or str(row.get('user_id') or '').strip()
+                if not target:
+                    raise ValueError("user_id is missing")
+            except ValueError as e:
+                result.add_error(location, str(e))
+                continue
+
+            timestamps = known_timestamps.get(target)
+            if timestamps is None:
+                user = self.storage.get_user(target)
+                if user is None and not create_users:
+                    result.add_error(location, f"unknown user {target}")
+                    continue
+                timestamps = known_timestamps[target] = {
+                    existing.timestamp for existing in user.responses
+                } if user else set()
+
+            if entry.timestamp in timestamps:
+                result.duplicates += 1
+                continue
+            timestamps.add(entry.timestamp)
+
+            pending.setdefault(target, []).append(entry)
+            pending_count += 1
+            if pending_count >= self.batch_size:
+                yield self._sorted(pending)
+                pending, pending_count = {}, 0
+
+        if pending:
+            yield self._sorted(pending)
+
+    @staticmethod
+    def _sorted(pending: ImportBatch) -> ImportBatch:
+        """Sort each user's entries so ``commit`` only merges two sorted runs."""
+        for entries in pending.values():
+            entries.sort(key=_entry_time)
+        return pending
+
+    def commit(self, batch: ImportBatch, result: ImportResult):
+        """Merge a batch of entries into their users and save them together."""
+        users = []
+        imported_at = datetime.now().isoformat()
+        for user_id, entries in batch.items():
+            user = self.storage.get_user(user_id) or User(id=user_id)
+            # Entries may have been added since the batch was read
+            existing = {entry.timestamp for entry in user.responses}
+            new_entries = [entry for entry in entries if entry.timestamp not in existing]
+            result.duplicates += len(entries) - len(new_entries)
+            if not new_entries:
+                continue
+            # Keep history in time order; both lists are already sorted, and the
+            # list is replaced rather than sorted in place so a concurrent save
+            # never sees it half-sorted
+            user.responses = sorted(user.responses + new_entries, key=_entry_time)
+            user.last_import = imported_at
+            users.append(user)
+            result.imported += len(new_entries)
+            result.user_ids.add(user_id)
+
+        if users:
+            self.storage.add_users(users)
+            result.writes += 1
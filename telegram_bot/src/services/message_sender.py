@@ -0,0 +1,70 @@
+"""Rate-limited delivery of messages the bot sends on its own schedule."""
+
+import asyncio
+from telegram import Bot
+from telegram.error import Forbidden, RetryAfter, TelegramError
+from src.utils.constants import BROADCAST_MESSAGES_PER_SECOND, BROADCAST_MAX_RETRIES
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class MessageSender:
+    """Sends scheduled messages within Telegram's broadcast limits."""
+
+    def __init__(
+        self,
+        messages_per_second: float = BROADCAST_MESSAGES_PER_SECOND,
+        max_retries: int = BROADCAST_MAX_RETRIES
+    ):
+        """
+        Initialize the sender.
+
+        Args:
+            messages_per_second: Maximum sustained send rate across all chats
+            max_retries: Attempts after a flood-control error before giving up
+        """
+        self.interval = 1.0 / messages_per_second
+        self.max_retries = max_retries
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _throttle(self):
+        """Wait for the next free send slot."""
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            wait = max(self._next_slot - now, 0.0)
+            self._next_slot = max(self._next_slot, now) + self.interval
+        if wait:
+            await asyncio.sleep(wait)
+
+    def _pause(self, seconds: float):
+        """Hold back every following send after a flood-control error."""
+        loop = asyncio.get_running_loop()
+        self._next_slot = max(self._next_slot, loop.time() + seconds)
+
+    async def send(self, bot: Bot, chat_id: str, text: str) -> bool:
+        """
+        Send a message, waiting out flood-control errors.
+
+        Returns:
+            True if the message was delivered, False if the user blocked the
+            bot or delivery kept failing
+        """
+        for attempt in range(self.max_retries + 1):
+            await self._throttle()
+            try:
+                await bot.send_message(chat_id=chat_id, text=text)
+                return True
+            except RetryAfter as e:
+                logger.warning(f"Flood control while sending to {chat_id}, retrying in {e.retry_after}s")
+                self._pause(e.retry_after)
+            except Forbidden as e:
+                logger.info(f"User {chat_id} cannot be messaged: {e}")
+                return False
+            except TelegramError as e:
+                logger.error(f"Error sending message to user {chat_id}: {e}")
+                return False
+
+        logger.error(f"Giving up on user {chat_id} after {self.max_retries} retries")
+        return False
@@ -1,10 +1,11 @@
 """Service for managing and delivering prompts."""
 
 import random
+import threading
 from datetime import datetime
 import pytz
-from typing import Tuple, Dict
-from src.models.user import User, JournalEntry
+from typing import Tuple, Dict, Optional
+from src.models.user import User, JournalEntry, MediaRef
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -17,6 +18,7 @@ class PromptService:
         self.prompts = prompts
         self.prompt_history = {}  # Track which prompts have been sent to avoid repetition
         self.user_prompt_counts = {}  # Track number of prompts per user
+        self._lock = threading.RLock()  # Guards the history and counts across concurrent handlers
 
     def get_random_prompt(self) -> Tuple[str, str]:
         """Get a random prompt and its type."""
@@ -30,23 +32,24 @@ class PromptService:
             logger.warning(f"Unknown prompt type: {prompt_type}, defaulting to random type")
             return self.get_random_prompt()[0]
             
-        # Initialize history for this type if not exists
-        if prompt_type not in self.prompt_history:
-            self.prompt_history[prompt_type] = []
+        with self._lock:
+            # Initialize history for this type if not exists
+            if prompt_type not in self.prompt_history:
+                self.prompt_history[prompt_type] = []
             
-        available_prompts = [p for p in self.prompts[prompt_type] 
-                            if p not in self.prompt_history[prompt_type]]
+            available_prompts = [p for p in self.prompts[prompt_type] 
+                                if p not in self.prompt_history[prompt_type]]
         
-        # If all prompts have been used, reset history
-        if not available_prompts:
-            logger.info(f"All prompts of type {prompt_type} have been used, resetting history")
-            self.prompt_history[prompt_type] = []
-            available_prompts = self.prompts[prompt_type]
+            # If all prompts have been used, reset history
+            if not available_prompts:
+                logger.info(f"All prompts of type {prompt_type} have been used, resetting history")
+                self.prompt_history[prompt_type] = []
+                available_prompts = self.prompts[prompt_type]
             
-        prompt = random.choice(available_prompts)
+            prompt = random.choice(available_prompts)
         
-        # Add to history
-        self.prompt_history[prompt_type].append(prompt)
+            # Add to history
+            self.prompt_history[prompt_type].append(prompt)
         
         return prompt
 
@@ -59,13 +62,14 @@ class PromptService:
         Returns:
             Tuple containing (prompt_text, prompt_type)
         """
-        # Initialize count if this is a new user
-        if user_id not in self.user_prompt_counts:
-            self.user_prompt_counts[user_id] = 0
+        with self._lock:
+            # Initialize count if this is a new user
+            if user_id not in self.user_prompt_counts:
+                self.user_prompt_counts[user_id] = 0
             
-        # Increment the count for this user
-        self.user_prompt_counts[user_id] += 1
-        count = self.user_prompt_counts[user_id]
+            # Increment the count for this user
+            self.user_prompt_counts[user_id] += 1
+            count = self.user_prompt_counts[user_id]
         
         # Determine prompt type based on count
         # Odd numbers (including 1) get self-awareness
@@ -81,13 +85,20 @@ class PromptService:
         prompt = self.get_prompt_by_type(prompt_type)
         return prompt, prompt_type
 
-    def create_journal_entry(self, prompt: str, response: str, prompt_type: str) -> JournalEntry:
+    def create_journal_entry(
+        self,
+        prompt: str,
+        response: str,
+        prompt_type: str,
+        media: Optional[MediaRef] = None
+    ) -> JournalEntry:
         """Create a new journal entry."""
         return JournalEntry(
             prompt=prompt,
             response=response,
             timestamp=datetime.now().isoformat(),
-            prompt_type=prompt_type
+            prompt_type=prompt_type,
+            media=media
         )
 
     def should_send_prompt(self, user: User, target_hour: int, target_day: int) -> bool:
@@ -1,68 +1,342 @@
 """Storage service for managing user data persistence."""
 
-import json
+import bisect
 import os
-from typing import Dict, Optional
+import shutil
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 from src.models.user import User
+from src.services.user_cache import CacheStats, UserCache
+from src.services.user_files import RandomAccessUserFile, RecordError, open_user_file
+from src.utils.constants import USER_PAGE_SIZE
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Filter applied to users while paging
+UserPredicate = Callable[[User], bool]
+# A page entry is either a full User or a dict of the projected fields
+UserRecord = Union[User, Dict[str, Any]]
+
 class StorageService:
-    """Handles persistence of user data."""
+    """
+    Handles persistence of user data.
+
+    By default every user is loaded at startup and each change rewrites the
+    users file. With a ``cache_size`` and an SQLite users file, only the most
+    recently used users are kept in memory: the rest are read on demand, and
+    changed users are written back when evicted or flushed.
+    """
+
+    def __init__(self, file_path: str, cache_size: Optional[int] = None):
+        """
+        Initialize storage service with file path.
 
-    def __init__(self, file_path: str):
-        """Initialize storage service with file path."""
+        Args:
+            file_path: Users file (.json, .jsonl or .db)
+            cache_size: Maximum number of users kept in memory, None or 0 for all
+        """
         self.file_path = file_path
-        self.users: Dict[str, User] = {}
+        self.user_file = open_user_file(file_path)
+        self.users: Dict[str, User] = {}  # Every user, unless the cache is used
+        self.cache: Optional[UserCache] = None
+        self.load_errors: List[RecordError] = []
+        self._user_ids: List[str] = []  # Sorted user IDs used as page cursors
+        # Guards users, cache and _user_ids; handlers run concurrently and may call in from threads
+        self._lock = threading.RLock()
         self._ensure_storage_directory()
-        self._load_users()
+        if cache_size and isinstance(self.user_file, RandomAccessUserFile):
+            self.cache = UserCache(cache_size, self._write_back)
+            self._user_ids = list(self.user_file.iter_ids())
+            logger.info(f"Caching up to {cache_size} of {len(self._user_ids)} users from {file_path}")
+        else:
+            if cache_size:
+                logger.warning(f"{file_path} cannot be read per user, so every user is kept in memory")
+            self._load_users()
 
     def _ensure_storage_directory(self):
         """Ensure the storage directory exists."""
         os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
 
     def _load_users(self):
-        """Load users from storage file."""
+        """Load users from storage file, skipping broken records."""
         try:
-            if os.path.exists(self.file_path):
-                with open(self.file_path, 'r') as f:
-                    data = json.load(f)
-                    self.users = {
-                        user_id: User.from_dict(user_id, user_data)
-                        for user_id, user_data in data.items()
-                    }
+            if self.user_file.exists():
+                # Records are streamed one at a time, so a damaged record
+                # only loses that user instead of the whole file
+                for user_id, user_data in self.user_file.iter_records():
+                    try:
+                        self.users[user_id] = User.from_dict(user_id, user_data)
+                    except Exception as e:
+                        self.user_file.errors.append(RecordError(user_id, self.file_path, f"invalid user: {e}"))
+                        logger.error(f"Skipping invalid user {user_id}: {e}")
         except Exception as e:
             logger.error(f"Error loading users: {e}")
-            self.users = {}
+
+        self.load_errors = list(self.user_file.errors)
+        if self.load_errors:
+            self._backup_damaged_file()
+        self._user_ids = sorted(self.users)
+
+    def _backup_damaged_file(self):
+        """Keep a copy of a damaged file before it is overwritten by the next save."""
+        backup_path = f"{self.file_path}.corrupt"
+        try:
+            shutil.copy2(self.file_path, backup_path)
+            logger.warning(
+                f"Loaded {len(self.users)} users, skipped {len(self.load_errors)} broken records; "
+                f"original file copied to {backup_path}"
+            )
+        except Exception as e:
+            logger.error(f"Error backing up damaged users file: {e}")
 
     def save_users(self):
-        """Save users to storage file."""
+        """Save users to storage file; with the cache, write back the changed users."""
+        if self.cache is not None:
+            self.flush()
+            return
         try:
-            with open(self.file_path, 'w') as f:
-                json.dump(
-                    {user_id: user.to_dict() for user_id, user in self.users.items()},
-                    f,
-                    indent=2
+            with self._lock:
+                self.user_file.write_records(
+                    (user_id, user.to_dict()) for user_id, user in self.users.items()
                 )
         except Exception as e:
             logger.error(f"Error saving users: {e}")
 
+    def flush(self):
+        """Write back users changed since they were cached. Without the cache every change is already saved."""
+        if self.cache is None:
+            return
+        with self._lock:
+            users = self.cache.dirty_users()
+            if users and self._write_back(users):
+                self.cache.mark_clean(users)
+
+    def _write_back(self, users: List[User]) -> bool:
+        """Persist cached users in one transaction, returning whether it succeeded."""
+        if not users:
+            return True
+        try:
+            self.user_file.upsert_records((user.id, user.to_dict()) for user in users)
+            return True
+        except Exception as e:
+            # The users stay dirty and are retried on the next flush
+            logger.error(f"Error writing back {len(users)} users: {e}")
+            return False
+
+    @property
+    def cache_stats(self) -> Optional[CacheStats]:
+        """Hit, miss and eviction counters of the user cache, None without the cache."""
+        return self.cache.stats if self.cache is not None else None
+
+    def _has_user_id(self, user_id: str) -> bool:
+        index = bisect.bisect_left(self._user_ids, user_id)
+        return index < len(self._user_ids) and self._user_ids[index] == user_id
+
+    def _load_user(self, user_id: str, data: Dict) -> Optional[User]:
+        try:
+            return User.from_dict(user_id, data)
+        except Exception as e:
+            self.load_errors.append(RecordError(user_id, self.file_path, f"invalid user: {e}"))
+            logger.error(f"Skipping invalid user {user_id}: {e}")
+            return None
+
     def get_user(self, user_id: str) -> Optional[User]:
         """Get a user by ID."""
-        return self.users.get(user_id)
+        if self.cache is None:
+            return self.users.get(user_id)
+
+        with self._lock:
+            user = self.cache.get(user_id)
+            if user is None and self._has_user_id(user_id):
+                data = self.user_file.read_records([user_id]).get(user_id)
+                user = self._load_user(user_id, data) if data is not None else None
+                if user:
+                    self.cache.put(user)
+            return user
 
     def add_user(self, user: User):
         """Add or update a user."""
-        self.users[user.id] = user
-        self.save_users()
+        with self._lock:
+            if self.cache is not None:
+                # Written back when evicted or on the next flush
+                if not self._has_user_id(user.id):
+                    bisect.insort(self._user_ids, user.id)
+                self.cache.put(user, dirty=True)
+                return
+            if user.id not in self.users:
+                bisect.insort(self._user_ids, user.id)
+            self.users[user.id] = user
+            self.save_users()
+
+    def add_users(self, users: Iterable[User]):
+        """Add or update many users with a single write."""
+        with self._lock:
+            if self.cache is not None:
+                # Bulk changes go straight to the store so they do not flush hot users out of the cache
+                users = list(users)
+                for user in users:
+                    if not self._has_user_id(user.id):
+                        bisect.insort(self._user_ids, user.id)
+                if self._write_back(users):
+                    self.cache.mark_clean(users)
+                return
+            for user in users:
+                if user.id not in self.users:
+                    bisect.insort(self._user_ids, user.id)
+                self.users[user.id] = user
+            self.save_users()
 
     def get_all_users(self) -> Dict[str, User]:
-        """Get all users."""
-        return self.users.copy()
+        """Get a copy of all users. Prefer the paged iterators for fan-out."""
+        with self._lock:
+            if self.cache is None:
+                return self.users.copy()
+            return {user.id: user for user in self._users_for_ids(self._user_ids)}
+
+    def _users_for_ids(self, user_ids: Sequence[str]) -> List[User]:
+        """
+        Get users in the given order, reading the uncached ones in one query.
+
+        Users read here are not added to the cache, so scans over every user
+        do not evict the active ones, but they are tracked by weak reference
+        so a later ``get_user`` returns the same object while it is in use.
+        """
+        if self.cache is None:
+            return [self.users[user_id] for user_id in user_ids]
+
+        found = {}
+        missing = []
+        for user_id in user_ids:
+            user = self.cache.peek(user_id)
+            if user is None:
+                missing.append(user_id)
+            else:
+                found[user_id] = user
+        if missing:
+            for user_id, data in self.user_file.read_records(missing).items():
+                user = self._load_user(user_id, data)
+                if user:
+                    found[user_id] = self.cache.track(user)
+        return [found[user_id] for user_id in user_ids if user_id in found]
+
+    def get_users_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = USER_PAGE_SIZE,
+        predicate: Optional[UserPredicate] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Tuple[List[UserRecord], Optional[str]]:
+        """
+        Get one page of users ordered by user ID.
+
+        Args:
+            cursor: Cursor returned by the previous page, None for the first page
+            limit: Maximum number of users in the page
+            predicate: Only include users for which this returns True
+            fields: Return dicts with only these User attributes instead of User objects
+
+        Returns:
+            Tuple containing (users, next_cursor); next_cursor is None after the last page
+        """
+        if limit < 1:
+            raise ValueError("Page limit must be at least 1")
+
+        ids_only = predicate is None and fields is not None and tuple(fields) == ('id',)
+        with self._lock:
+            index = bisect.bisect_right(self._user_ids, cursor) if cursor is not None else 0
+            page: List[UserRecord] = []
+            while index < len(self._user_ids) and len(page) < limit:
+                user_ids = self._user_ids[index:index + limit - len(page)]
+                index += len(user_ids)
+                if ids_only:
+                    # No user data needed, so nothing is loaded
+                    page.extend({'id': user_id} for user_id in user_ids)
+                    continue
+                for user in self._users_for_ids(user_ids):
+                    if predicate and not predicate(user):
+                        continue
+                    page.append(self._project(user, fields))
+
+            next_cursor = self._user_ids[index - 1] if index < len(self._user_ids) else None
+            return page, next_cursor
+
+    def iter_user_pages(
+        self,
+        page_size: int = USER_PAGE_SIZE,
+        predicate: Optional[UserPredicate] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Iterator[List[UserRecord]]:
+        """
+        Iterate over all users in pages of at most ``page_size``.
+
+        Users added or deleted while iterating are picked up or skipped
+        according to their position relative to the cursor.
+        """
+        cursor = None
+        while True:
+            page, cursor = self.get_users_page(cursor, page_size, predicate, fields)
+            if page:
+                yield page
+            if cursor is None:
+                return
+
+    def iter_users(
+        self,
+        page_size: int = USER_PAGE_SIZE,
+        predicate: Optional[UserPredicate] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Iterator[UserRecord]:
+        """Iterate over users one at a time, fetching them page by page."""
+        for page in self.iter_user_pages(page_size, predicate, fields):
+            yield from page
+
+    def iter_user_ids(
+        self,
+        page_size: int = USER_PAGE_SIZE,
+        predicate: Optional[UserPredicate] = None
+    ) -> Iterator[str]:
+        """Iterate over user IDs without copying any user data."""
+        for record in self.iter_users(page_size, predicate, fields=('id',)):
+            yield record['id']
+
+    @staticmethod
+    def _project(user: User, fields: Optional[Sequence[str]]) -> UserRecord:
+        """Reduce a user to the requested fields."""
+        if fields is None:
+            return user
+        return {name: getattr(user, name) for name in fields}
 
     def delete_user(self, user_id: str):
         """Delete a user."""
-        if user_id in self.users:
-            del self.users[user_id]
-            self.save_users()
+        with self._lock:
+            if self.cache is not None:
+                if self._has_user_id(user_id):
+                    self.cache.discard(user_id)
+                    self._user_ids.pop(bisect.bisect_left(self._user_ids, user_id))
+                    self.user_file.delete_records([user_id])
+                return
+            if user_id in self.users:
+                del self.users[user_id]
+                self._user_ids.pop(bisect.bisect_left(self._user_ids, user_id))
+                self.save_users()
+
+
+class StorageEngine:
+    """Storage shared by several bots, with one namespace per tenant."""
+
+    def __init__(self):
+        """Initialize an engine without any open namespaces."""
+        self.namespaces: Dict[str, StorageService] = {}
+
+    def namespace(self, name: str, file_path: str, cache_size: Optional[int] = None) -> StorageService:
+        """Get the storage for a tenant, opening it on first use."""
+        if name not in self.namespaces:
+            self.namespaces[name] = StorageService(file_path, cache_size)
+            logger.info(f"Opened storage namespace {name} at {file_path}")
+        return self.namespaces[name]
+
+    def save_all(self):
+        """Save every open namespace."""
+        for storage in self.namespaces.values():
+            storage.save_users()
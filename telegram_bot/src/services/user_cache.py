@@ -0,0 +1,147 @@
+"""Bounded cache of User objects with write-back of changed users."""
+
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from src.models.user import User
+
+# Persists users that changed since they were loaded, returning whether it succeeded
+WriteBack = Callable[[List[User]], bool]
+
+@dataclass
+class CacheStats:
+    """Counters of a user cache."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    write_backs: int = 0  # Changed users written when evicted or flushed
+    size: int = 0
+    capacity: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+class UserCache:
+    """
+    Least recently used cache of User objects.
+
+    Users marked dirty are handed to ``write_back`` when they are evicted and
+    stay dirty until a write succeeds; evicted users whose write failed are
+    held until a later flush persists them. An evicted user that is still
+    referenced elsewhere (e.g. by a running handler) is found again through a
+    weak reference, so there is never more than one live User object per ID.
+    The cache is not thread-safe; callers hold their own lock.
+    """
+
+    def __init__(self, capacity: int, write_back: WriteBack):
+        """
+        Initialize the cache.
+
+        Args:
+            capacity: Maximum number of users kept in memory
+            write_back: Called with the changed users that are evicted, returns
+                whether they were persisted
+        """
+        if capacity < 1:
+            raise ValueError("Cache capacity must be at least 1")
+        self.capacity = capacity
+        self.write_back = write_back
+        self.stats = CacheStats(capacity=capacity)
+        self._entries: 'OrderedDict[str, User]' = OrderedDict()
+        self._dirty: Set[str] = set()
+        self._unsaved: Dict[str, User] = {}  # Evicted dirty users whose write failed
+        self._evicted: 'weakref.WeakValueDictionary[str, User]' = weakref.WeakValueDictionary()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._entries
+
+    def get(self, user_id: str) -> Optional[User]:
+        """Get a cached user and mark it as recently used, counting the hit or miss."""
+        user = self.peek(user_id)
+        if user is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        if user_id in self._entries:
+            self._entries.move_to_end(user_id)
+        else:
+            self.put(user)
+        return user
+
+    def peek(self, user_id: str) -> Optional[User]:
+        """Get a user held in memory without counting or reordering."""
+        user = self._entries.get(user_id)
+        if user is None:
+            user = self._unsaved.get(user_id)
+        if user is None:
+            user = self._evicted.get(user_id)
+        return user
+
+    def put(self, user: User, dirty: bool = False):
+        """Add or refresh a user, evicting the least recently used users if full."""
+        self._entries[user.id] = user
+        self._entries.move_to_end(user.id)
+        self._evicted.pop(user.id, None)
+        if self._unsaved.pop(user.id, None) is not None:
+            dirty = True
+        if dirty:
+            self._dirty.add(user.id)
+        if len(self._entries) > self.capacity:
+            self._evict(len(self._entries) - self.capacity)
+        self.stats.size = len(self._entries)
+
+    def track(self, user: User) -> User:
+        """
+        Register a user read outside the cache without adding it.
+
+        Returns the user already held in memory for its ID, if any, so callers
+        never hand out a second object for the same user.
+        """
+        held = self.peek(user.id)
+        if held is not None:
+            return held
+        self._evicted[user.id] = user
+        return user
+
+    def mark_clean(self, users: Iterable[User]):
+        """Record that users have been persisted."""
+        for user in users:
+            if self._unsaved.get(user.id) is user:
+                del self._unsaved[user.id]
+            elif user.id in self._dirty and self._entries.get(user.id) is user:
+                self._dirty.discard(user.id)
+            else:
+                continue
+            self.stats.write_backs += 1
+
+    def discard(self, user_id: str):
+        """Forget a user without writing it back."""
+        self._entries.pop(user_id, None)
+        self._evicted.pop(user_id, None)
+        self._unsaved.pop(user_id, None)
+        self._dirty.discard(user_id)
+        self.stats.size = len(self._entries)
+
+    def dirty_users(self) -> List[User]:
+        """Users changed since they were last persisted; call ``mark_clean`` once written."""
+        return [self._entries[user_id] for user_id in self._dirty] + list(self._unsaved.values())
+
+    def _evict(self, count: int):
+        evicted = []
+        for _ in range(count):
+            user_id, user = self._entries.popitem(last=False)
+            self._evicted[user_id] = user
+            if user_id in self._dirty:
+                # Held strongly until written, the weak reference alone could lose the change
+                self._dirty.discard(user_id)
+                self._unsaved[user_id] = user
+                evicted.append(user)
+        self.stats.evictions += count
+        if evicted and self.write_back(evicted):
+            self.mark_clean(evicted)
@@ -0,0 +1,468 @@
+"""Streaming readers and writers for the user storage file formats.
+
+Three formats are supported, chosen by file extension:
+- ``.json``: the legacy single JSON object keyed by user ID
+- ``.jsonl``: one JSON object per line with the user ID in an ``id`` field
+- ``.db``/``.sqlite``: an SQLite table of user ID and JSON data
+
+Every reader yields ``(user_id, user_data)`` records one at a time and
+records broken entries in ``errors`` instead of failing the whole file, and
+every writer consumes an iterator of records, so converting between formats
+never needs the whole file in memory. Only the SQLite format can also read
+and write single users (``RandomAccessUserFile``).
+"""
+
+import json
+import os
+from abc import ABC, abstractmethod
+import re
+import sqlite3
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+from src.utils.constants import MAX_USER_RECORD_SIZE, USER_FILE_CHUNK_SIZE
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# A user ID and the dictionary produced by User.to_dict
+UserRecordData = Tuple[str, Dict]
+
+@dataclass
+class RecordError:
+    """A user record that could not be read."""
+    user_id: Optional[str]
+    location: str
+    reason: str
+
+    def __str__(self) -> str:
+        user = f"user {self.user_id}" if self.user_id else "unknown user"
+        return f"{user} at {self.location}: {self.reason}"
+
+class UserFile(ABC):
+    """Base class for a user storage file."""
+
+    def __init__(self, file_path: str):
+        """Initialize with the path of the file."""
+        self.file_path = file_path
+        self.errors: List[RecordError] = []
+
+    def exists(self) -> bool:
+        """Check whether the file exists."""
+        return os.path.exists(self.file_path)
+
+    @abstractmethod
+    def iter_records(self) -> Iterator[UserRecordData]:
+        """Yield every readable user record, collecting broken ones in ``errors``."""
+
+    @abstractmethod
+    def write_records(self, records: Iterable[UserRecordData]) -> int:
+        """Replace the file contents with ``records``, returning how many were written."""
+
+    def record_error(self, user_id: Optional[str], location: str, reason: str):
+        """Record and log a broken user record."""
+        error = RecordError(user_id, location, reason)
+        self.errors.append(error)
+        logger.error(f"Skipping broken record in {self.file_path}: {error}")
+
+    def _atomic_write(self, write: Callable[[TextIO], int]) -> int:
+        """Write to a temporary file and move it into place once complete."""
+        tmp_path = f"{self.file_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                count = write(f)
+            os.replace(tmp_path, self.file_path)
+            return count
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+# Tokens used by the legacy JSON scanner
+_KEY = re.compile(r'"((?:[^"\\\n]|\\.)*)"')
+_STRUCTURE = re.compile(r'[{}\[\]",\n]')
+_IN_STRING = re.compile(r'["\\\n]')
+_WHITESPACE = re.compile(r'[ \t\r\n,]*')
+# json.dump(indent=2) starts every top-level key on a line indented by exactly two spaces
+_TOP_LEVEL_KEY = re.compile(r'\n  "')
+_DECODER = json.JSONDecoder()
+
+class _ScanError(Exception):
+    """Raised when a record cannot be delimited."""
+
+class LegacyJsonUserFile(UserFile):
+    """The original ``users.json`` format, read incrementally."""
+
+    def __init__(
+        self,
+        file_path: str,
+        chunk_size: int = USER_FILE_CHUNK_SIZE,
+        max_record_size: int = MAX_USER_RECORD_SIZE
+    ):
+        """
+        Initialize the reader.
+
+        Args:
+            file_path: Path of the JSON file
+            chunk_size: Characters read from disk at a time
+            max_record_size: Records larger than this are reported as broken
+        """
+        super().__init__(file_path)
+        self.chunk_size = chunk_size
+        self.max_record_size = max_record_size
+        self._file: Optional[TextIO] = None
+        self._text = ''
+        self._pos = 0
+        self._base = 0  # Character offset of self._text[0] in the file
+        self._eof = False
+
+    def iter_records(self) -> Iterator[UserRecordData]:
+        """
+        Scan the file one user at a time.
+
+        Only the record being read is held in memory. A record whose JSON is
+        invalid is skipped; if its structure is damaged the scanner resumes
+        at the next line that starts a top-level user ID.
+        """
+        with open(self.file_path, 'r', encoding='utf-8', errors='replace') as f:
+            self._file, self._text, self._pos, self._base, self._eof = f, '', 0, 0, False
+            self._skip_whitespace()
+            if not self._ensure(1) or self._text[self._pos] != '{':
+                self.record_error(None, self._location(), "file is not a JSON object")
+                return
+            self._pos += 1
+
+            while True:
+                self._compact()
+                self._skip_whitespace()
+                if not self._ensure(1):
+                    self.record_error(None, self._location(), "unexpected end of file")
+                    return
+                if self._text[self._pos] == '}':
+                    brace = self._pos
+                    self._pos += 1
+                    if self._at_end():
+                        return
+                    # A stray brace must not hide the users that follow it;
+                    # _at_end only reads ahead, so the position can be restored
+                    self._pos = brace
+                    self.record_error(None, self._location(), "unexpected '}' before the end of the file")
+                    self._pos += 1
+                    if not self._resync():
+                        return
+                    continue
+
+                start = self._location()
+                user_id = None
+                try:
+                    user_id = self._read_key()
+                    data = self._decode_value()
+                    if data is None:
+                        value = self._read_value()
+                except _ScanError as e:
+                    self.record_error(user_id, start, str(e))
+                    if not self._resync():
+                        return
+                    continue
+
+                if data is None:
+                    try:
+                        data = json.loads(value)
+                    except ValueError as e:
+                        self.record_error(user_id, start, f"invalid JSON: {e}")
+                        continue
+                if not isinstance(data, dict):
+                    self.record_error(user_id, start, "user data is not an object")
+                    continue
+                yield user_id, data
+
+    def write_records(self, records: Iterable[UserRecordData]) -> int:
+        """Write records in the same layout as ``json.dump(..., indent=2)``."""
+        def write(f: TextIO) -> int:
+            count = 0
+            for user_id, data in records:
+                f.write('{\n' if count == 0 else ',\n')
+                value = json.dumps(data, indent=2).replace('\n', '\n  ')
+                f.write(f"  {json.dumps(user_id)}: {value}")
+                count += 1
+            f.write('\n}' if count else '{}')
+            return count
+        return self._atomic_write(write)
+
+    def _location(self) -> str:
+        return f"character {self._base + self._pos}"
+
+    def _fill(self) -> bool:
+        """Read another chunk, returning False at end of file."""
+        if self._eof:
+            return False
+        chunk = self._file.read(self.chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._text += chunk
+        return True
+
+    def _ensure(self, count: int) -> bool:
+        """Make sure ``count`` characters are buffered after the position."""
+        while len(self._text) - self._pos < count:
+            if not self._fill():
+                return False
+        return True
+
+    def _compact(self, force: bool = False):
+        """Drop consumed text from the buffer once it outgrows a chunk."""
+        if self._pos and (force or self._pos >= self.chunk_size):
+            self._base += self._pos
+            self._text = self._text[self._pos:]
+            self._pos = 0
+
+    def _skip_whitespace(self):
+        """Skip whitespace and record separators."""
+        while True:
+            self._pos = _WHITESPACE.match(self._text, self._pos).end()
+            if self._pos < len(self._text) or not self._fill():
+                return
+
+    def _at_end(self) -> bool:
+        """Check that only whitespace is left in the file."""
+        while True:
+            while self._pos < len(self._text) and self._text[self._pos].isspace():
+                self._pos += 1
+            if self._pos < len(self._text):
+                return False
+            if not self._fill():
+                return True
+
+    def _read_key(self) -> str:
+        """Read a quoted user ID and the following colon."""
+        while True:
+            match = _KEY.match(self._text, self._pos)
+            if match:
+                break
+            # A key cannot span lines, so only read more while the line is incomplete
+            if '\n' in self._text[self._pos:] or len(self._text) - self._pos > self.max_record_size or not self._fill():
+                raise _ScanError("expected a quoted user ID")
+        user_id = json.loads(match.group(0))
+        self._pos = match.end()
+
+        self._skip_whitespace()
+        if not self._ensure(1) or self._text[self._pos] != ':':
+            raise _ScanError("expected ':' after user ID")
+        self._pos += 1
+        self._skip_whitespace()
+        return user_id
+
+    def _decode_value(self) -> Optional[Dict]:
+        """
+        Decode the value at the position from the buffer in one step.
+
+        Returns None when the value is incomplete or damaged, in which case
+        the slower scanner has to find where the record ends.
+        """
+        try:
+            data, end = _DECODER.raw_decode(self._text, self._pos)
+        except ValueError:
+            return None
+        # A damaged record can swallow the next user and still be valid JSON
+        if _TOP_LEVEL_KEY.search(self._text, self._pos, end):
+            return None
+        self._pos = end
+        return data
+
+    def _read_value(self) -> str:
+        """Find the extent of the value that follows a key and return its text."""
+        start = self._pos
+        depth = 0
+        in_string = False
+        while True:
+            if self._pos - start > self.max_record_size:
+                raise _ScanError(f"record larger than {self.max_record_size} characters")
+
+            match = (_IN_STRING if in_string else _STRUCTURE).search(self._text, self._pos)
+            if not match:
+                self._pos = len(self._text)
+                if not self._fill():
+                    raise _ScanError("file ends inside the record")
+                continue
+
+            char = match.group(0)
+            self._pos = match.end()
+            if in_string:
+                if char == '"':
+                    in_string = False
+                elif char == '\\':
+                    if not self._ensure(1):
+                        raise _ScanError("file ends inside the record")
+                    self._pos += 1
+                else:
+                    self._pos = match.start()
+                    raise _ScanError("line break inside a string")
+            elif char == '"':
+                in_string = True
+            elif char in '{[':
+                depth += 1
+            elif char in '}]':
+                if depth == 0:
+                    # A bare value closed by the end of the top-level object
+                    self._pos = match.start()
+                    return self._text[start:self._pos]
+                depth -= 1
+                if depth == 0:
+                    return self._text[start:self._pos]
+            elif char == ',':
+                if depth == 0:
+                    self._pos = match.start()
+                    return self._text[start:self._pos]
+            elif depth > 0:
+                # A new top-level key inside a record means the record was cut short
+                if self._ensure(3) and self._text.startswith('  "', self._pos):
+                    self._pos = match.start()
+                    raise _ScanError("record is cut short by the next user")
+
+    def _resync(self) -> bool:
+        """Skip ahead to the next top-level user ID, returning False at end of file."""
+        while True:
+            match = _TOP_LEVEL_KEY.search(self._text, self._pos)
+            if match:
+                self._pos = match.start()
+                return True
+            # Keep a few characters in case the marker spans two chunks
+            self._pos = max(self._pos, len(self._text) - 3)
+            self._compact(force=True)
+            if not self._fill():
+                return False
+
+class JsonLinesUserFile(UserFile):
+    """One user per line, with the user ID in the ``id`` field."""
+
+    def iter_records(self) -> Iterator[UserRecordData]:
+        with open(self.file_path, 'r', encoding='utf-8', errors='replace') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    data = json.loads(line)
+                    user_id = str(data.pop('id'))
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    self.record_error(None, f"line {line_number}", f"invalid record: {e}")
+                    continue
+                yield user_id, data
+
+    def write_records(self, records: Iterable[UserRecordData]) -> int:
+        def write(f: TextIO) -> int:
+            count = 0
+            for user_id, data in records:
+                f.write(json.dumps({'id': user_id, **data}) + '\n')
+                count += 1
+            return count
+        return self._atomic_write(write)
+
+class RandomAccessUserFile(UserFile):
+    """A user storage file that can also read and write single users."""
+
+    @abstractmethod
+    def iter_ids(self) -> Iterator[str]:
+        """Yield every user ID in ascending order."""
+
+    @abstractmethod
+    def read_records(self, user_ids: Sequence[str]) -> Dict[str, Dict]:
+        """Read the given users, skipping missing and broken ones."""
+
+    @abstractmethod
+    def upsert_records(self, records: Iterable[UserRecordData]) -> int:
+        """Insert or replace the given users, returning how many were written."""
+
+    @abstractmethod
+    def delete_records(self, user_ids: Sequence[str]):
+        """Delete the given users."""
+
+class SqliteUserFile(RandomAccessUserFile):
+    """Users stored as rows of (id, JSON data) in an SQLite database."""
+
+    # Stay below SQLite's default limit on query parameters
+    _MAX_PARAMETERS = 500
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.file_path)
+        connection.execute("CREATE TABLE IF NOT EXISTS users (id TEXT PRIMARY KEY, data TEXT NOT NULL)")
+        return connection
+
+    def iter_records(self) -> Iterator[UserRecordData]:
+        connection = self._connect()
+        try:
+            for user_id, raw in connection.execute("SELECT id, data FROM users ORDER BY id"):
+                try:
+                    data = json.loads(raw)
+                except ValueError as e:
+                    self.record_error(user_id, "users table", f"invalid JSON: {e}")
+                    continue
+                yield user_id, data
+        finally:
+            connection.close()
+
+    def write_records(self, records: Iterable[UserRecordData]) -> int:
+        connection = self._connect()
+        try:
+            # One transaction, so readers never see a partially written table
+            with connection:
+                connection.execute("DELETE FROM users")
+                cursor = connection.executemany(
+                    "INSERT INTO users (id, data) VALUES (?, ?)",
+                    ((user_id, json.dumps(data)) for user_id, data in records)
+                )
+            return cursor.rowcount
+        finally:
+            connection.close()
+
+    def iter_ids(self) -> Iterator[str]:
+        connection = self._connect()
+        try:
+            for (user_id,) in connection.execute("SELECT id FROM users ORDER BY id"):
+                yield user_id
+        finally:
+            connection.close()
+
+    def read_records(self, user_ids: Sequence[str]) -> Dict[str, Dict]:
+        records = {}
+        connection = self._connect()
+        try:
+            for start in range(0, len(user_ids), self._MAX_PARAMETERS):
+                chunk = user_ids[start:start + self._MAX_PARAMETERS]
+                placeholders = ', '.join('?' * len(chunk))
+                query = f"SELECT id, data FROM users WHERE id IN ({placeholders})"
+                for user_id, raw in connection.execute(query, chunk):
+                    try:
+                        records[user_id] = json.loads(raw)
+                    except ValueError as e:
+                        self.record_error(user_id, "users table", f"invalid JSON: {e}")
+            return records
+        finally:
+            connection.close()
+
+    def upsert_records(self, records: Iterable[UserRecordData]) -> int:
+        connection = self._connect()
+        try:
+            with connection:
+                cursor = connection.executemany(
+                    "INSERT OR REPLACE INTO users (id, data) VALUES (?, ?)",
+                    ((user_id, json.dumps(data)) for user_id, data in records)
+                )
+            return cursor.rowcount
+        finally:
+            connection.close()
+
+    def delete_records(self, user_ids: Sequence[str]):
+        connection = self._connect()
+        try:
+            with connection:
+                connection.executemany("DELETE FROM users WHERE id = ?", ((user_id,) for user_id in user_ids))
+        finally:
+            connection.close()
+
+def open_user_file(file_path: str) -> UserFile:
+    """Get the reader and writer for a user file based on its extension."""
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == '.jsonl':
+        return JsonLinesUserFile(file_path)
+    if extension in ('.db', '.sqlite', '.sqlite3'):
+        return SqliteUserFile(file_path)
+    return LegacyJsonUserFile(file_path)
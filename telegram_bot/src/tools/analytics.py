@@ -0,0 +1,178 @@
+"""Answer common product questions from an exported columnar journal file.
+
+Columns are read batch by batch as arrays, and only the columns a report
+needs are decompressed. Each batch is viewed as numpy arrays without copying
+and aggregated with whole-array operations instead of a loop per row.
+
+The export holds responses only, not the prompts that were sent, so reports
+show each group's share of entries and its time to respond; a response rate
+per weekday would need prompt-send data that is not stored.
+
+Usage:
+    python -m src.tools.analytics data/journal.jcol summary
+    python -m src.tools.analytics data/journal.jcol prompts --top 10
+    python -m src.tools.analytics data/journal.jcol weekdays
+    python -m src.tools.analytics data/journal.jcol types
+"""
+
+import argparse
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from src.utils.columnar import ColumnarReader
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+SECONDS_PER_DAY = 86400
+
+class GroupStats:
+    """Per-group count, response length and time-to-response accumulators."""
+
+    def __init__(self, groups: int):
+        self.groups = groups
+        self.count = np.zeros(groups, dtype=np.int64)
+        self.length = np.zeros(groups, dtype=np.int64)
+        self._keys: List[np.ndarray] = []
+        self._times: List[np.ndarray] = []
+        self._sorted: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def add_batch(self, keys: np.ndarray, lengths: np.ndarray, response_times: np.ndarray):
+        """Accumulate one batch of rows."""
+        self.count += np.bincount(keys, minlength=self.groups)
+        self.length += np.bincount(keys, weights=lengths, minlength=self.groups).astype(np.int64)
+        known = response_times >= 0
+        self._keys.append(keys[known])
+        self._times.append(response_times[known])
+        self._sorted = None
+
+    def _sorted_times(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Known response times sorted by group then time, and each group's start offset."""
+        if self._sorted is None:
+            keys = np.concatenate(self._keys) if self._keys else np.zeros(0, dtype=np.int64)
+            times = np.concatenate(self._times) if self._times else np.zeros(0, dtype=np.int64)
+            times = times[np.lexsort((times, keys))]
+            counts = np.bincount(keys, minlength=self.groups)
+            starts = np.concatenate(([0], np.cumsum(counts)))
+            self._sorted = (times, starts)
+        return self._sorted
+
+    def row(self, key: int, total: int) -> Dict[str, float]:
+        """Summarize one group."""
+        count = int(self.count[key])
+        sorted_times, starts = self._sorted_times()
+        times = sorted_times[starts[key]:starts[key + 1]]
+        return {
+            'count': count,
+            'share': count / total if total else 0.0,
+            'avg_length': self.length[key] / count if count else 0.0,
+            'median_hours': times[len(times) // 2] / 3600 if len(times) else None,
+            'within_day': np.searchsorted(times, SECONDS_PER_DAY, 'right') / len(times) if len(times) else None,
+        }
+
+def _column(values: array) -> np.ndarray:
+    """View a column array as a numpy array without copying."""
+    return np.frombuffer(values, dtype=values.typecode)
+
+def _weekdays(timestamps: np.ndarray) -> np.ndarray:
+    """Map local epoch seconds to weekday numbers, Monday being 0."""
+    # 1970-01-01 was a Thursday
+    return (timestamps // SECONDS_PER_DAY + 3) % 7
+
+def aggregate(reader: ColumnarReader, key_column: str, groups: int) -> GroupStats:
+    """Group rows by a dictionary-encoded column or by weekday."""
+    stats = GroupStats(groups)
+    source = 'timestamp' if key_column == 'weekday' else key_column
+    for batch in reader.iter_batches([source, 'response_length', 'time_to_response']):
+        keys = _weekdays(_column(batch['timestamp'])) if key_column == 'weekday' else _column(batch[source])
+        stats.add_batch(keys, _column(batch['response_length']), _column(batch['time_to_response']))
+    return stats
+
+def _format_table(title: str, labels: Sequence[str], stats: GroupStats, order: Sequence[int]) -> str:
+    total = int(stats.count.sum())
+    lines = [f"{title:<50}{'entries':>10}{'share':>8}{'avg len':>9}{'med ttr h':>11}{'<24h':>7}"]
+    for key in order:
+        row = stats.row(key, total)
+        if not row['count']:
+            continue
+        label = labels[key] if len(labels[key]) <= 48 else labels[key][:45] + '...'
+        median = f"{row['median_hours']:.1f}" if row['median_hours'] is not None else '-'
+        within_day = f"{row['within_day']:.0%}" if row['within_day'] is not None else '-'
+        lines.append(
+            f"{label:<50}{row['count']:>10}{row['share']:>8.1%}{row['avg_length']:>9.0f}{median:>11}{within_day:>7}"
+        )
+    return "\n".join(lines)
+
+def report_prompts(reader: ColumnarReader, top: int) -> str:
+    """Prompts ranked by average response length."""
+    prompts = reader.dictionaries['prompts']
+    stats = aggregate(reader, 'prompt_id', len(prompts))
+    order = sorted(
+        (key for key in range(len(prompts)) if stats.count[key]),
+        key=lambda key: stats.length[key] / stats.count[key],
+        reverse=True
+    )[:top]
+    return _format_table("prompt (by avg response length)", prompts, stats, order)
+
+def report_weekdays(reader: ColumnarReader) -> str:
+    """Share of entries and time to respond by weekday."""
+    stats = aggregate(reader, 'weekday', len(WEEKDAYS))
+    return (
+        _format_table("weekday (share of entries)", WEEKDAYS, stats, range(len(WEEKDAYS)))
+        + "\nShares are of entries written, not response rates: prompt sends are not exported."
+    )
+
+def report_types(reader: ColumnarReader) -> str:
+    """Responses by prompt type."""
+    types = reader.dictionaries['prompt_types']
+    stats = aggregate(reader, 'prompt_type', len(types))
+    return _format_table("prompt type", types, stats, range(len(types)))
+
+def report_summary(reader: ColumnarReader) -> str:
+    """Overall totals."""
+    users = []
+    first, last = None, None
+    media = np.zeros(len(reader.dictionaries['media_kinds']), dtype=np.int64)
+    for batch in reader.iter_batches(['user_hash', 'timestamp', 'media_kind']):
+        users.append(np.unique(_column(batch['user_hash'])))
+        timestamps = _column(batch['timestamp'])
+        if len(timestamps):
+            low, high = int(timestamps.min()), int(timestamps.max())
+            first = low if first is None else min(first, low)
+            last = high if last is None else max(last, high)
+        media += np.bincount(_column(batch['media_kind']), minlength=len(media))
+
+    lines = [
+        f"Entries: {reader.rows}",
+        f"Users: {len(np.unique(np.concatenate(users))) if users else 0}",
+        f"Prompts: {len(reader.dictionaries['prompts'])}",
+    ]
+    if first is not None:
+        lines.append(f"Days covered: {(last - first) / SECONDS_PER_DAY:.0f}")
+    for kind, count in zip(reader.dictionaries['media_kinds'], media):
+        if kind and count:
+            lines.append(f"{kind.capitalize()} entries: {count}")
+    return "\n".join(lines)
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Aggregate an exported columnar journal file")
+    parser.add_argument('file', help="File written by src.tools.export_analytics")
+    subparsers = parser.add_subparsers(dest='report', required=True)
+    subparsers.add_parser('summary', help="Overall totals")
+    prompts_parser = subparsers.add_parser('prompts', help="Prompts with the longest answers")
+    prompts_parser.add_argument('--top', type=int, default=10)
+    subparsers.add_parser('weekdays', help="Share of entries and response times by weekday")
+    subparsers.add_parser('types', help="Responses by prompt type")
+    args = parser.parse_args()
+
+    reader = ColumnarReader(args.file)
+    if args.report == 'summary':
+        print(report_summary(reader))
+    elif args.report == 'prompts':
+        print(report_prompts(reader, args.top))
+    elif args.report == 'weekdays':
+        print(report_weekdays(reader))
+    else:
+        print(report_types(reader))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Export journal entry metadata to a compressed columnar file.
+
+Users are streamed from the users file one at a time and every journal
+entry becomes one row. Response text is not exported, only its length.
+
+Columns:
+    user_hash         8-byte BLAKE2b hash of the user ID
+    prompt_id         index into the ``prompts`` dictionary
+    prompt_type       index into the ``prompt_types`` dictionary
+    timestamp         entry time as seconds since 1970-01-01 in bot local time
+    response_length   characters in the response
+    time_to_response  seconds from prompt to response, -1 when unknown
+    media_kind        index into the ``media_kinds`` dictionary
+
+Only the latest prompt's send time is stored per user, so time_to_response
+is known just for the response to ``last_prompt``.
+
+Usage:
+    python -m src.tools.export_analytics data/users.json data/journal.jcol
+"""
+
+import argparse
+import hashlib
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional
+from src.services.user_files import open_user_file
+from src.utils.columnar import ColumnarWriter
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = [
+    ('user_hash', 'Q'),
+    ('prompt_id', 'I'),
+    ('prompt_type', 'H'),
+    ('timestamp', 'q'),
+    ('response_length', 'I'),
+    ('time_to_response', 'q'),
+    ('media_kind', 'B'),
+]
+
+MEDIA_KINDS = ['', 'voice', 'photo']
+_EPOCH = datetime(1970, 1, 1)
+
+class _Dictionary:
+    """Assigns consecutive IDs to distinct strings."""
+
+    def __init__(self, values: Optional[List[str]] = None):
+        self.values: List[str] = list(values or [])
+        self._ids: Dict[str, int] = {value: index for index, value in enumerate(self.values)}
+
+    def id_for(self, value: str) -> int:
+        index = self._ids.get(value)
+        if index is None:
+            index = self._ids[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+def _seconds(timestamp: str) -> int:
+    """Convert an ISO timestamp to local epoch seconds, ignoring any offset."""
+    return int((datetime.fromisoformat(timestamp).replace(tzinfo=None) - _EPOCH).total_seconds())
+
+def hash_user_id(user_id: str, salt: bytes = b'') -> int:
+    """Pseudonymize a user ID as an unsigned 64-bit integer."""
+    return int.from_bytes(hashlib.blake2b(user_id.encode('utf-8'), digest_size=8, key=salt).digest(), 'little')
+
+def export_analytics(users_path: str, output_path: str, salt: bytes = b'', batch_size: int = 65536) -> int:
+    """
+    Stream every journal entry of a users file into a columnar file.
+
+    Returns:
+        Number of rows written
+    """
+    source = open_user_file(users_path)
+    prompts = _Dictionary()
+    prompt_types = _Dictionary()
+    media_kinds = _Dictionary(MEDIA_KINDS)
+    skipped = 0
+
+    with ColumnarWriter(output_path, SCHEMA, batch_size=batch_size) as writer:
+        for user_id, data in source.iter_records():
+            user_hash = hash_user_id(user_id, salt)
+            last_prompt = data.get('last_prompt') or {}
+            try:
+                prompted_at = _seconds(last_prompt['timestamp']) if last_prompt.get('timestamp') else None
+            except ValueError:
+                prompted_at = None
+
+            for entry in data.get('responses', []):
+                try:
+                    timestamp = _seconds(entry['timestamp'])
+                    prompt = entry['prompt']
+                    response = entry.get('response') or ''
+                except (KeyError, TypeError, ValueError) as e:
+                    skipped += 1
+                    logger.warning(f"Skipping entry of user {user_id}: {e}")
+                    continue
+
+                time_to_response = -1
+                if prompted_at is not None and prompt == last_prompt.get('text') and timestamp >= prompted_at:
+                    time_to_response = timestamp - prompted_at
+                media = entry.get('media') or {}
+
+                columns = writer.columns
+                columns['user_hash'].append(user_hash)
+                columns['prompt_id'].append(prompts.id_for(prompt))
+                columns['prompt_type'].append(prompt_types.id_for(entry.get('prompt_type', 'unknown')))
+                columns['timestamp'].append(timestamp)
+                columns['response_length'].append(len(response))
+                columns['time_to_response'].append(time_to_response)
+                columns['media_kind'].append(media_kinds.id_for(media.get('kind', '')))
+                writer.row_added()
+
+        writer.dictionaries = {
+            'prompts': prompts.values,
+            'prompt_types': prompt_types.values,
+            'media_kinds': media_kinds.values,
+        }
+        rows = writer.rows
+
+    for error in source.errors:
+        print(f"skipped {error}", file=sys.stderr)
+    logger.info(f"Exported {rows} entries to {output_path}, skipped {skipped} broken entries")
+    return rows
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Export journal metadata to a columnar file")
+    parser.add_argument('users_file', help="Users file (.json, .jsonl or .db)")
+    parser.add_argument('output', help="Columnar file to write, e.g. data/journal.jcol")
+    parser.add_argument('--salt', default='', help="Secret mixed into user ID hashes (max 64 bytes)")
+    parser.add_argument('--batch-size', type=int, default=65536, help="Rows per compressed batch")
+    args = parser.parse_args()
+
+    rows = export_analytics(args.users_file, args.output, args.salt.encode('utf-8'), args.batch_size)
+    print(f"Wrote {rows} rows to {args.output}")
+
+if __name__ == "__main__":
+    main()
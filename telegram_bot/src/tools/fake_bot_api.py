@@ -0,0 +1,554 @@
+"""Local stand-in for the Telegram Bot API used for offline load testing.
+
+The server speaks just enough HTTP/1.1 for python-telegram-bot's httpx client
+and implements getMe, getUpdates, sendMessage, sendDocument, sendVoice,
+sendPhoto, getFile with file downloads, and webhook delivery. Latency, 429
+``RetryAfter`` responses and "bot was blocked" errors can be injected to
+exercise the bot's error paths.
+
+Run standalone with:
+    python -m src.tools.fake_bot_api --port 8081 --latency 0.05
+and point the bot at it with BOT_API_BASE_URL=http://127.0.0.1:8081/bot
+and BOT_API_FILE_URL=http://127.0.0.1:8081/file/bot
+"""
+
+import argparse
+import asyncio
+import email.parser
+import email.policy
+import itertools
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import httpx
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Methods that deliver content to a chat and are therefore subject to
+# rate limiting and blocked-chat errors
+SEND_METHODS = {'sendMessage', 'sendDocument', 'sendVoice', 'sendPhoto'}
+
+HTTP_REASONS = {200: 'OK', 400: 'Bad Request', 403: 'Forbidden', 404: 'Not Found', 429: 'Too Many Requests'}
+
+@dataclass
+class FakeBotApiSettings:
+    """Fault and latency injection knobs for the fake server."""
+    latency: float = 0.0  # Seconds added to every send call
+    jitter: float = 0.0  # Uniform random extra latency in seconds
+    retry_after_rate: float = 0.0  # Probability a send call returns 429
+    retry_after: int = 1  # Seconds reported in injected 429 responses
+    blocked_rate: float = 0.0  # Probability a send call returns 403
+    blocked_chats: Set[int] = field(default_factory=set)  # Chats that always return 403
+    seed: Optional[int] = None
+
+# Callback invoked for every successful send call with (method, params, result)
+SendListener = Callable[[str, Dict, Dict], None]
+
+class BotApiError(Exception):
+    """Error response returned to the bot as an unsuccessful API result."""
+
+    def __init__(self, status: int, description: str, parameters: Optional[Dict] = None):
+        super().__init__(description)
+        self.status = status
+        self.description = description
+        self.parameters = parameters
+
+    def to_dict(self) -> Dict:
+        """Convert the error to a Bot API response body."""
+        data = {'ok': False, 'error_code': self.status, 'description': self.description}
+        if self.parameters:
+            data['parameters'] = self.parameters
+        return data
+
+# Callback invoked for every rejected send call with (method, params, error)
+FailureListener = Callable[[str, Dict, BotApiError], None]
+
+def build_text_update(chat_id: int, text: str, message_id: int, first_name: str = "Load") -> Dict:
+    """Build a private-chat text message as the Bot API would deliver it."""
+    message = {
+        'message_id': message_id,
+        'date': int(time.time()),
+        'chat': {'id': chat_id, 'type': 'private', 'first_name': first_name},
+        'from': {'id': chat_id, 'is_bot': False, 'first_name': first_name},
+        'text': text,
+    }
+    if text.startswith('/'):
+        command = text.split()[0]
+        message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(command)}]
+    return message
+
+def build_media_update(
+    chat_id: int,
+    kind: str,
+    file_id: str,
+    message_id: int,
+    caption: Optional[str] = None,
+    first_name: str = "Load"
+) -> Dict:
+    """Build a private-chat voice note or photo message."""
+    message = build_text_update(chat_id, '', message_id, first_name)
+    del message['text']
+    if kind == 'voice':
+        message['voice'] = {'file_id': file_id, 'file_unique_id': file_id, 'duration': 1}
+    else:
+        message['photo'] = [{'file_id': file_id, 'file_unique_id': file_id, 'width': 640, 'height': 480}]
+    if caption:
+        message['caption'] = caption
+    return message
+
+@dataclass
+class _BotState:
+    """Update queue and webhook registration of one bot token."""
+    pending: List[Dict] = field(default_factory=list)
+    updates_available: asyncio.Event = field(default_factory=asyncio.Event)
+    webhook_url: Optional[str] = None
+    webhook_secret: Optional[str] = None
+    webhook_slots: Optional[asyncio.Semaphore] = None
+
+class FakeBotApiServer:
+    """In-process fake of the Telegram Bot API HTTP interface."""
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        settings: Optional[FakeBotApiSettings] = None
+    ):
+        """
+        Initialize the server.
+
+        Args:
+            host: Interface to bind to
+            port: Port to bind to, 0 picks a free port
+            settings: Latency and fault injection settings
+        """
+        self.host = host
+        self.port = port
+        self.settings = settings or FakeBotApiSettings()
+        self.stats: Counter = Counter()
+        self._random = random.Random(self.settings.seed)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._listeners: List[SendListener] = []
+        self._failure_listeners: List[FailureListener] = []
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+        self._file_ids = itertools.count(1)
+        self._bots: Dict[str, _BotState] = {}
+        self._webhook_client: Optional[httpx.AsyncClient] = None
+        self._webhook_tasks: Set[asyncio.Task] = set()
+        self._connections: Set[asyncio.Task] = set()
+        self._files: Dict[str, bytes] = {}
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to configure as the bot's ``api_base_url``."""
+        return f"http://{self.host}:{self.port}/bot"
+
+    @property
+    def file_url(self) -> str:
+        """Base URL to configure as the bot's ``api_file_url``."""
+        return f"http://{self.host}:{self.port}/file/bot"
+
+    async def start(self):
+        """Start listening for bot API requests."""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Fake Bot API listening on {self.base_url}")
+
+    async def stop(self):
+        """Stop the server and any in-flight webhook deliveries."""
+        for task in list(self._webhook_tasks) + list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._webhook_tasks, *self._connections, return_exceptions=True)
+        if self._webhook_client:
+            await self._webhook_client.aclose()
+            self._webhook_client = None
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def add_listener(self, listener: SendListener):
+        """Register a callback for every successful send call."""
+        self._listeners.append(listener)
+
+    def add_failure_listener(self, listener: FailureListener):
+        """Register a callback for every send call answered with an error."""
+        self._failure_listeners.append(listener)
+
+    def add_file(self, content: bytes) -> str:
+        """Register file content that the bot can fetch with getFile, returning its file_id."""
+        file_id = f"fake-file-{next(self._file_ids)}"
+        self._files[file_id] = content
+        return file_id
+
+    def next_message_id(self) -> int:
+        """Allocate a message ID for an incoming user message."""
+        return next(self._message_ids)
+
+    def _bot(self, bot_token: str) -> _BotState:
+        """Get the state of a bot token, creating it on first use."""
+        if bot_token not in self._bots:
+            self._bots[bot_token] = _BotState()
+        return self._bots[bot_token]
+
+    def push_update(self, bot_token: str, message: Dict) -> int:
+        """
+        Queue an incoming message for the bot with the given token.
+
+        The update is delivered through the webhook if one is set, otherwise
+        it is returned by the next getUpdates call.
+
+        Returns:
+            The update ID assigned to the message
+        """
+        update = {'update_id': next(self._update_ids), 'message': message}
+        self.stats['updates_pushed'] += 1
+        bot = self._bot(bot_token)
+        if bot.webhook_url:
+            task = asyncio.create_task(self._deliver_webhook(bot, update))
+            self._webhook_tasks.add(task)
+            task.add_done_callback(self._webhook_tasks.discard)
+        else:
+            bot.pending.append(update)
+            bot.updates_available.set()
+        return update['update_id']
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve HTTP/1.1 requests on a keep-alive connection."""
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                path, headers, body = request
+                if path.startswith('/file/'):
+                    status, data, content_type = self._download(path)
+                else:
+                    status, payload = await self._dispatch(path, headers, body)
+                    data, content_type = json.dumps(payload).encode('utf-8'), 'application/json'
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTP_REASONS.get(status, 'Error')}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    "Connection: keep-alive\r\n\r\n".encode('latin-1') + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Client went away or the server is stopping
+            pass
+        except Exception as e:
+            logger.error(f"Fake Bot API connection error: {e}")
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, Dict[str, str], bytes]]:
+        """Read one request, returning None when the client closed the connection."""
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        _, target, _ = request_line.decode('latin-1').split(' ', 2)
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                chunk = await reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                chunks.append(chunk[:-2])
+            body = b''.join(chunks)
+        else:
+            body = await reader.readexactly(int(headers.get('content-length', '0')))
+        return urlsplit(target).path, headers, body
+
+    def _parse_params(self, headers: Dict[str, str], body: bytes) -> Dict:
+        """Decode url-encoded, multipart or JSON request parameters."""
+        content_type = headers.get('content-type', '')
+        if not body:
+            return {}
+        if content_type.startswith('application/json'):
+            return json.loads(body)
+        if content_type.startswith('multipart/form-data'):
+            message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+                f"Content-Type: {content_type}\r\n\r\n".encode('latin-1') + body
+            )
+            params = {}
+            for part in message.iter_parts():
+                name = part.get_param('name', header='content-disposition')
+                filename = part.get_filename()
+                payload = part.get_payload(decode=True) or b''
+                if filename is not None:
+                    params[name] = {'file_name': filename, 'size': len(payload)}
+                else:
+                    params[name] = payload.decode('utf-8')
+            return params
+        return dict(parse_qsl(body.decode('utf-8'), keep_blank_values=True))
+
+    def _download(self, path: str) -> Tuple[int, bytes, str]:
+        """Serve file content for /file/bot<token>/<file_id> paths."""
+        self.stats['calls.download'] += 1
+        content = self._files.get(path.rsplit('/', 1)[-1])
+        if content is None:
+            return 404, b'Not Found', 'text/plain'
+        return 200, content, 'application/octet-stream'
+
+    async def _dispatch(self, path: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Dict]:
+        """Route a request to the matching API method."""
+        # Paths look like /bot<token>/<method>
+        method = path.rsplit('/', 1)[-1]
+        self.stats[f"calls.{method}"] += 1
+        params: Dict = {}
+        try:
+            params = self._parse_params(headers, body)
+            handler = getattr(self, f"_api_{method}", None)
+            if method in SEND_METHODS:
+                await self._inject_faults(params)
+            result = await handler(path, params) if handler else True
+            if method in SEND_METHODS:
+                for listener in self._listeners:
+                    listener(method, params, result)
+            return 200, {'ok': True, 'result': result}
+        except BotApiError as e:
+            if method in SEND_METHODS:
+                for listener in self._failure_listeners:
+                    listener(method, params, e)
+            return e.status, e.to_dict()
+        except Exception as e:
+            logger.error(f"Fake Bot API failed to handle {method}: {e}")
+            return 400, {'ok': False, 'error_code': 400, 'description': f"Bad Request: {e}"}
+
+    async def _inject_faults(self, params: Dict):
+        """Apply configured latency and error injection to a send call."""
+        settings = self.settings
+        delay = settings.latency + (self._random.uniform(0, settings.jitter) if settings.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        chat_id = int(params.get('chat_id', 0))
+        if chat_id in settings.blocked_chats or (
+            settings.blocked_rate and self._random.random() < settings.blocked_rate
+        ):
+            self.stats['injected.blocked'] += 1
+            raise BotApiError(403, "Forbidden: bot was blocked by the user")
+        if settings.retry_after_rate and self._random.random() < settings.retry_after_rate:
+            self.stats['injected.retry_after'] += 1
+            raise BotApiError(
+                429,
+                f"Too Many Requests: retry after {settings.retry_after}",
+                {'retry_after': settings.retry_after}
+            )
+
+    @staticmethod
+    def _token(path: str) -> str:
+        """Extract the bot token from a /bot<token>/<method> path."""
+        return path.split('/')[-2][len('bot'):]
+
+    def _bot_user(self, path: str) -> Dict:
+        """Build the bot's own user object from the token in the path."""
+        token = self._token(path)
+        bot_id = int(token.split(':')[0]) if token.split(':')[0].isdigit() else 1
+        return {
+            'id': bot_id,
+            'is_bot': True,
+            'first_name': 'Fake Journal Bot',
+            'username': 'fake_journal_bot',
+            'can_join_groups': False,
+            'can_read_all_group_messages': False,
+            'supports_inline_queries': False,
+        }
+
+    def _outgoing_message(self, path: str, chat_id: int) -> Dict:
+        """Build the base of a message sent by the bot."""
+        return {
+            'message_id': next(self._message_ids),
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': self._bot_user(path),
+        }
+
+    async def _api_getMe(self, path: str, params: Dict) -> Dict:
+        return self._bot_user(path)
+
+    async def _api_getUpdates(self, path: str, params: Dict) -> List[Dict]:
+        offset = int(params.get('offset', 0) or 0)
+        limit = int(params.get('limit', 100) or 100)
+        timeout = float(params.get('timeout', 0) or 0)
+
+        bot = self._bot(self._token(path))
+
+        # Updates below the offset are confirmed and can be forgotten
+        if offset:
+            bot.pending = [u for u in bot.pending if u['update_id'] >= offset]
+
+        if not bot.pending and timeout:
+            bot.updates_available.clear()
+            try:
+                await asyncio.wait_for(bot.updates_available.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return bot.pending[:limit]
+
+    async def _api_sendMessage(self, path: str, params: Dict) -> Dict:
+        message = self._outgoing_message(path, int(params['chat_id']))
+        message['text'] = params.get('text', '')
+        return message
+
+    async def _api_sendDocument(self, path: str, params: Dict) -> Dict:
+        message = self._outgoing_message(path, int(params['chat_id']))
+        document = params.get('document')
+        if isinstance(document, dict):
+            file_id = f"fake-document-{next(self._file_ids)}"
+            message['document'] = {
+                'file_id': file_id,
+                'file_unique_id': file_id,
+                'file_name': document['file_name'],
+                'file_size': document['size'],
+            }
+        else:
+            # Re-sending by file_id or URL
+            message['document'] = {'file_id': document, 'file_unique_id': document}
+        if params.get('caption'):
+            message['caption'] = params['caption']
+        return message
+
+    def _sent_file(self, params: Dict, name: str) -> str:
+        """Get the file_id of a file sent by the bot, registering uploads."""
+        value = params.get(name)
+        if isinstance(value, dict):
+            # Uploads are not kept, only their size is known
+            self.stats[f"uploads.{name}"] += 1
+            return self.add_file(b'\0' * value['size'])
+        self.stats[f"resends.{name}"] += 1
+        return value
+
+    async def _api_sendVoice(self, path: str, params: Dict) -> Dict:
+        message = self._outgoing_message(path, int(params['chat_id']))
+        file_id = self._sent_file(params, 'voice')
+        message['voice'] = {'file_id': file_id, 'file_unique_id': file_id, 'duration': 1}
+        if params.get('caption'):
+            message['caption'] = params['caption']
+        return message
+
+    async def _api_sendPhoto(self, path: str, params: Dict) -> Dict:
+        message = self._outgoing_message(path, int(params['chat_id']))
+        file_id = self._sent_file(params, 'photo')
+        message['photo'] = [{'file_id': file_id, 'file_unique_id': file_id, 'width': 640, 'height': 480}]
+        if params.get('caption'):
+            message['caption'] = params['caption']
+        return message
+
+    async def _api_getFile(self, path: str, params: Dict) -> Dict:
+        file_id = params.get('file_id')
+        if file_id not in self._files:
+            raise BotApiError(400, "Bad Request: invalid file_id")
+        return {
+            'file_id': file_id,
+            'file_unique_id': file_id,
+            'file_size': len(self._files[file_id]),
+            'file_path': file_id,
+        }
+
+    async def _api_setWebhook(self, path: str, params: Dict) -> bool:
+        token = self._token(path)
+        bot = self._bot(token)
+        bot.webhook_url = params.get('url') or None
+        bot.webhook_secret = params.get('secret_token') or None
+        bot.webhook_slots = asyncio.Semaphore(int(params.get('max_connections', 40) or 40))
+        if bot.webhook_url and not self._webhook_client:
+            self._webhook_client = httpx.AsyncClient()
+        # Updates queued for polling are handed over to the webhook
+        pending, bot.pending = bot.pending, []
+        for update in pending:
+            self.push_update(token, update['message'])
+        return True
+
+    async def _api_deleteWebhook(self, path: str, params: Dict) -> bool:
+        bot = self._bot(self._token(path))
+        bot.webhook_url = None
+        if params.get('drop_pending_updates') in ('true', 'True', True):
+            bot.pending = []
+        return True
+
+    async def _api_getWebhookInfo(self, path: str, params: Dict) -> Dict:
+        bot = self._bot(self._token(path))
+        return {
+            'url': bot.webhook_url or '',
+            'has_custom_certificate': False,
+            'pending_update_count': len(bot.pending),
+        }
+
+    async def _deliver_webhook(self, bot: _BotState, update: Dict):
+        """POST an update to the bot's webhook, retrying on failure."""
+        headers = {}
+        if bot.webhook_secret:
+            headers['X-Telegram-Bot-Api-Secret-Token'] = bot.webhook_secret
+        async with bot.webhook_slots:
+            for attempt in range(3):
+                try:
+                    response = await self._webhook_client.post(bot.webhook_url, json=update, headers=headers)
+                    if response.status_code == 200:
+                        self.stats['webhook.delivered'] += 1
+                        return
+                except httpx.HTTPError as e:
+                    logger.warning(f"Webhook delivery of update {update['update_id']} failed: {e}")
+                await asyncio.sleep(0.1 * (attempt + 1))
+        self.stats['webhook.failed'] += 1
+
+async def _serve(args: argparse.Namespace):
+    """Run the fake server until interrupted."""
+    settings = FakeBotApiSettings(
+        latency=args.latency,
+        jitter=args.jitter,
+        retry_after_rate=args.retry_after_rate,
+        retry_after=args.retry_after,
+        blocked_rate=args.blocked_rate,
+        seed=args.seed
+    )
+    server = FakeBotApiServer(args.host, args.port, settings)
+    await server.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+def add_fault_arguments(parser: argparse.ArgumentParser):
+    """Add the latency and fault injection options shared by the CLIs."""
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every send call")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Random extra latency in seconds")
+    parser.add_argument('--retry-after-rate', type=float, default=0.0, help="Probability of a 429 response")
+    parser.add_argument('--retry-after', type=int, default=1, help="retry_after seconds in 429 responses")
+    parser.add_argument('--blocked-rate', type=float, default=0.0, help="Probability of a blocked-chat error")
+    parser.add_argument('--seed', type=int, default=None, help="Random seed for fault injection")
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Run a fake Telegram Bot API server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    add_fault_arguments(parser)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Bulk import journal entries from CSV, JSON Lines or JSON files.
+
+Rows need ``timestamp`` and ``response`` columns and, unless --user-id is
+given, a ``user_id`` column; ``prompt`` and ``prompt_type`` are optional.
+Entries are committed in large batches, one write of the users file each.
+
+Stop the bot before running this: it rewrites the same users file.
+
+Usage:
+    python -m src.tools.import_journals export.csv --user-id 123456
+    python -m src.tools.import_journals entries.jsonl --users-file data/users.db
+"""
+
+import argparse
+import os
+from src.services.import_service import ImportService
+from src.services.storage_service import StorageService
+from src.utils.constants import IMPORT_BATCH_SIZE
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Bulk import journal entries into a users file")
+    parser.add_argument('file', help="Entries to import (.csv, .jsonl or .json)")
+    parser.add_argument(
+        '--users-file',
+        default=os.getenv('USERS_FILE', 'data/users.json'),
+        help="Users file to import into (default: $USERS_FILE or data/users.json)"
+    )
+    parser.add_argument('--user-id', help="Import every row for this user")
+    parser.add_argument('--no-create', action='store_true', help="Skip rows for users that do not exist")
+    parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help="Entries per write")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        parser.error(f"{args.file} does not exist")
+
+    storage = StorageService(args.users_file)
+    result = ImportService(storage, args.batch_size).import_file(
+        args.file,
+        user_id=args.user_id,
+        create_users=not args.no_create
+    )
+
+    print(
+        f"Imported {result.imported} entries for {len(result.user_ids)} users "
+        f"in {result.writes} writes; {result.duplicates} duplicates, {result.invalid} invalid"
+    )
+    for error in result.errors:
+        print(f"  {error}")
+
+if __name__ == "__main__":
+    main()
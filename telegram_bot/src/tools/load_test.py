@@ -0,0 +1,278 @@
+"""End-to-end load test of JournalBot against the fake Bot API server.
+
+Simulated users each run the /start -> /prompt -> reply -> /history flow.
+Every step pushes an update to the fake server and waits for the bot's
+reply, so latency covers update delivery, handler work, storage and the
+outgoing API call.
+
+Usage:
+    python -m src.tools.load_test --users 2000 --concurrency 200 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from src.bot import JournalBot
+from src.config import Config
+from src.services.user_cache import CacheStats
+from src.tools.fake_bot_api import (
+    BotApiError,
+    FakeBotApiServer,
+    FakeBotApiSettings,
+    add_fault_arguments,
+    build_text_update
+)
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+FAKE_TOKEN = "123456:FAKE-LOAD-TEST-TOKEN"
+FIRST_CHAT_ID = 10_000_000
+
+# Steps of the simulated journaling flow
+FLOW = [
+    ('start', "/start"),
+    ('prompt', "/prompt"),
+    ('reply', "Today I noticed that I listen better when I am not rushing."),
+    ('history', "/history"),
+]
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+@dataclass
+class LoadTestReport:
+    """Results of a load test run."""
+    users: int
+    duration: float
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+    errors: Counter = field(default_factory=Counter)
+    server_stats: Counter = field(default_factory=Counter)
+    cache_stats: Optional[CacheStats] = None
+
+    @property
+    def completed_steps(self) -> int:
+        return sum(len(values) for values in self.latencies.values())
+
+    @property
+    def total_steps(self) -> int:
+        return self.users * len(FLOW)
+
+    def format(self) -> str:
+        """Render the report as a plain text table."""
+        lines = [
+            f"Users: {self.users}  Duration: {self.duration:.2f}s  "
+            f"Throughput: {self.completed_steps / self.duration if self.duration else 0:.1f} steps/s",
+            f"{'step':<10}{'ok':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}",
+        ]
+        for name, _ in FLOW:
+            values = self.latencies.get(name, [])
+            lines.append(
+                f"{name:<10}{len(values):>8}{self.errors[name]:>8}"
+                f"{percentile(values, 50) * 1000:>10.1f}"
+                f"{percentile(values, 95) * 1000:>10.1f}"
+                f"{percentile(values, 99) * 1000:>10.1f}"
+            )
+        failed = sum(self.errors[name] for name, _ in FLOW)
+        lines.append(f"Error rate: {failed / self.total_steps if self.total_steps else 0:.2%}")
+        for key in sorted(self.server_stats):
+            lines.append(f"  {key}: {self.server_stats[key]}")
+        if self.cache_stats:
+            stats = self.cache_stats
+            lines.append(
+                f"User cache: {stats.size}/{stats.capacity} users  hit rate {stats.hit_rate:.1%}  "
+                f"misses {stats.misses}  evictions {stats.evictions}  write-backs {stats.write_backs}"
+            )
+        return "\n".join(lines)
+
+class LoadTestDriver:
+    """Drives simulated users through the journaling flow."""
+
+    def __init__(self, server: FakeBotApiServer, step_timeout: float = 10.0):
+        """
+        Initialize the driver.
+
+        Args:
+            server: Running fake Bot API server the bot is connected to
+            step_timeout: Seconds to wait for a reply before counting an error
+        """
+        self.server = server
+        self.step_timeout = step_timeout
+        self.latencies: Dict[str, List[float]] = {name: [] for name, _ in FLOW}
+        self.errors: Counter = Counter()
+        self._waiting: Dict[int, asyncio.Future] = {}
+        server.add_listener(self._on_send)
+        server.add_failure_listener(self._on_failure)
+
+    def _on_send(self, method: str, params: Dict, result: Dict):
+        """Resolve the pending step of the chat the bot replied to."""
+        future = self._waiting.pop(int(params['chat_id']), None)
+        if future and not future.done():
+            future.set_result(params.get('text', ''))
+
+    def _on_failure(self, method: str, params: Dict, error: BotApiError):
+        """Fail the pending step of the chat whose reply was rejected."""
+        future = self._waiting.pop(int(params.get('chat_id', 0)), None)
+        if future and not future.done():
+            future.set_exception(error)
+
+    async def run_user(self, chat_id: int):
+        """Run one simulated user through the full flow."""
+        for name, text in FLOW:
+            future = asyncio.get_running_loop().create_future()
+            self._waiting[chat_id] = future
+            started = time.perf_counter()
+            message = build_text_update(chat_id, text, self.server.next_message_id())
+            self.server.push_update(FAKE_TOKEN, message)
+            try:
+                reply = await asyncio.wait_for(future, self.step_timeout)
+            except asyncio.TimeoutError:
+                self._waiting.pop(chat_id, None)
+                self.errors[name] += 1
+                self.errors['timeout'] += 1
+                # Later steps depend on this one, so abandon the flow
+                return
+            except BotApiError:
+                self.errors[name] += 1
+                self.errors['api_error'] += 1
+                # The bot's error reply would otherwise answer the next step
+                return
+            if reply.startswith("Sorry"):
+                self.errors[name] += 1
+                continue
+            self.latencies[name].append(time.perf_counter() - started)
+
+    async def run(self, users: int, concurrency: int):
+        """Run ``users`` simulated users with at most ``concurrency`` active."""
+        slots = asyncio.Semaphore(concurrency)
+
+        async def limited(chat_id: int):
+            async with slots:
+                await self.run_user(chat_id)
+
+        await asyncio.gather(*(limited(FIRST_CHAT_ID + i) for i in range(users)))
+
+async def run_load_test(
+    users: int,
+    concurrency: int,
+    settings: Optional[FakeBotApiSettings] = None,
+    step_timeout: float = 10.0,
+    webhook_port: Optional[int] = None,
+    users_file: Optional[str] = None,
+    concurrent_updates: int = 64,
+    user_cache_size: int = 0
+) -> LoadTestReport:
+    """
+    Start a fake server and the bot, run the simulated users and report.
+
+    Args:
+        users: Number of simulated users
+        concurrency: Maximum number of users running their flow at once
+        settings: Latency and fault injection settings for the fake server
+        step_timeout: Seconds to wait for each reply
+        webhook_port: Receive updates by webhook on this port instead of polling
+        users_file: Storage file to use, defaults to a temporary file
+        concurrent_updates: Updates the bot processes at once
+        user_cache_size: Users kept in memory, needs an SQLite users file
+    """
+    server = FakeBotApiServer(settings=settings)
+    await server.start()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = Config(
+            bot_token=FAKE_TOKEN,
+            users_file=users_file or os.path.join(tmp_dir, 'users.json'),
+            check_interval=3600,
+            prompt_hour=9,
+            prompt_day=0,
+            max_history=5,
+            api_base_url=server.base_url,
+            api_file_url=server.file_url,
+            blob_dir=os.path.join(tmp_dir, 'blobs'),
+            concurrent_updates=concurrent_updates,
+            user_cache_size=user_cache_size
+        )
+        bot = JournalBot(config)
+        # No weekly prompts or nudges: their sends would be matched to the wrong steps
+        application = bot.build_application(schedule_jobs=False)
+        driver = LoadTestDriver(server, step_timeout)
+
+        async with application:
+            await application.start()
+            if webhook_port:
+                # Requires python-telegram-bot[webhooks]
+                await application.updater.start_webhook(
+                    listen='127.0.0.1',
+                    port=webhook_port,
+                    url_path='webhook',
+                    webhook_url=f"http://127.0.0.1:{webhook_port}/webhook"
+                )
+            else:
+                await application.updater.start_polling(poll_interval=0.0, timeout=1)
+
+            started = time.perf_counter()
+            await driver.run(users, concurrency)
+            duration = time.perf_counter() - started
+
+            await application.updater.stop()
+            await application.stop()
+        # post_shutdown only runs under run_polling
+        await bot.on_shutdown(application)
+
+    await server.stop()
+    return LoadTestReport(
+        users=users,
+        duration=duration,
+        latencies=driver.latencies,
+        errors=driver.errors,
+        server_stats=server.stats,
+        cache_stats=bot.storage_service.cache_stats
+    )
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Load test the journal bot against a fake Bot API")
+    parser.add_argument('--users', type=int, default=1000, help="Number of simulated users")
+    parser.add_argument('--concurrency', type=int, default=100, help="Users running at the same time")
+    parser.add_argument('--step-timeout', type=float, default=10.0, help="Seconds to wait for each reply")
+    parser.add_argument('--webhook-port', type=int, default=None, help="Use webhook delivery on this port")
+    parser.add_argument('--users-file', default=None, help="Storage file, defaults to a temporary file")
+    parser.add_argument('--concurrent-updates', type=int, default=64, help="Updates the bot processes at once")
+    parser.add_argument('--user-cache-size', type=int, default=0, help="Users kept in memory (.db users file)")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    settings = FakeBotApiSettings(
+        latency=args.latency,
+        jitter=args.jitter,
+        retry_after_rate=args.retry_after_rate,
+        retry_after=args.retry_after,
+        blocked_rate=args.blocked_rate,
+        seed=args.seed
+    )
+    report = asyncio.run(run_load_test(
+        users=args.users,
+        concurrency=args.concurrency,
+        settings=settings,
+        step_timeout=args.step_timeout,
+        webhook_port=args.webhook_port,
+        users_file=args.users_file,
+        concurrent_updates=args.concurrent_updates,
+        user_cache_size=args.user_cache_size
+    ))
+    print(report.format())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Convert a users file between storage formats with bounded memory.
+
+The format of each file is chosen by its extension (.json, .jsonl, .db).
+Users are streamed one at a time; broken records are skipped and reported.
+
+Usage:
+    python -m src.tools.migrate_users data/users.json data/users.db
+"""
+
+import argparse
+import os
+import sys
+from typing import Iterator
+from src.models.user import User
+from src.services.user_files import UserFile, UserRecordData, open_user_file
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+def iter_valid_records(source: UserFile) -> Iterator[UserRecordData]:
+    """Yield records that load as a User, normalized through the model."""
+    for user_id, user_data in source.iter_records():
+        try:
+            user = User.from_dict(user_id, user_data)
+        except Exception as e:
+            source.record_error(user_id, source.file_path, f"invalid user: {e}")
+            continue
+        yield user_id, user.to_dict()
+
+def migrate(source_path: str, target_path: str) -> int:
+    """
+    Copy every readable user from one file to another.
+
+    Returns:
+        Number of users written
+    """
+    if os.path.abspath(source_path) == os.path.abspath(target_path):
+        raise ValueError("Source and target must be different files")
+
+    source = open_user_file(source_path)
+    target = open_user_file(target_path)
+    count = target.write_records(iter_valid_records(source))
+
+    logger.info(f"Migrated {count} users from {source_path} to {target_path}")
+    for error in source.errors:
+        print(f"skipped {error}", file=sys.stderr)
+    return count
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Convert a users file between storage formats")
+    parser.add_argument('source', help="Existing users file (.json, .jsonl or .db)")
+    parser.add_argument('target', help="File to write (.json, .jsonl or .db)")
+    args = parser.parse_args()
+
+    source = open_user_file(args.source)
+    if not source.exists():
+        parser.error(f"{args.source} does not exist")
+
+    count = migrate(args.source, args.target)
+    print(f"Wrote {count} users to {args.target}")
+
+if __name__ == "__main__":
+    main()
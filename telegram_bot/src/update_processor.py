@@ -0,0 +1,87 @@
+"""Concurrent update processing that keeps each user's updates in order."""
+
+import asyncio
+import sys
+from typing import Awaitable, Dict, Optional
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class _UserSlot:
+    """Lock of one user and the number of updates holding or awaiting it."""
+    __slots__ = ('lock', 'users')
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """
+    Processes updates from different users concurrently and updates from the
+    same user one at a time, in the order they arrived.
+
+    Updates reach ``do_process_update`` in arrival order and ``asyncio.Lock``
+    wakes waiters first-in first-out, so a user's /prompt is handled before
+    the reply that follows it. A user's lock is dropped as soon as no update
+    of that user is running or waiting, so idle users cost nothing.
+
+    The concurrency limit is applied by the processor's own semaphore after
+    the user's lock is taken, so updates queued behind a slow user do not
+    hold slots other users need. The base class is given an unbounded limit
+    so its semaphore, which ``process_update`` takes first, never blocks;
+    ``concurrency_limit`` holds the real one.
+    """
+
+    def __init__(self, max_concurrent_updates: int):
+        """Initialize with the maximum number of updates processed at once."""
+        if max_concurrent_updates < 1:
+            raise ValueError("max_concurrent_updates must be a positive integer")
+        super().__init__(sys.maxsize)
+        self.concurrency_limit = max_concurrent_updates
+        self._running = asyncio.Semaphore(max_concurrent_updates)
+        self._slots: Dict[int, _UserSlot] = {}
+
+    @staticmethod
+    def _key(update: object) -> Optional[int]:
+        """Get the ID that updates are serialized by."""
+        if not isinstance(update, Update):
+            return None
+        if update.effective_user:
+            return update.effective_user.id
+        if update.effective_chat:
+            return update.effective_chat.id
+        return None
+
+    @property
+    def active_users(self) -> int:
+        """Number of users with an update running or waiting."""
+        return len(self._slots)
+
+    async def do_process_update(self, update: object, coroutine: Awaitable) -> None:
+        """Run the update once every earlier update of the same user has finished."""
+        key = self._key(update)
+        if key is None:
+            async with self._running:
+                await coroutine
+            return
+
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = _UserSlot()
+        slot.users += 1
+        try:
+            async with slot.lock:
+                async with self._running:
+                    await coroutine
+        finally:
+            slot.users -= 1
+            if slot.users == 0:
+                del self._slots[key]
+
+    async def initialize(self) -> None:
+        """Nothing to set up."""
+
+    async def shutdown(self) -> None:
+        """Nothing to tear down."""
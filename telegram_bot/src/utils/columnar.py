@@ -0,0 +1,159 @@
+"""Minimal compressed columnar file format built on the standard library.
+
+A file holds batches of rows. Each column of a batch is a typed ``array``
+stored as one zlib-compressed block, so readers load only the columns they
+need and get them back as arrays. Layout:
+
+    MAGIC | column blocks ... | footer JSON | footer length (8 bytes) | MAGIC
+
+The footer lists the schema, every block's offset and size, and any string
+dictionaries the writer chose to store (e.g. for dictionary-encoded columns).
+"""
+
+import json
+import struct
+import sys
+import zlib
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+MAGIC = b'JCOL1\n'
+_FOOTER_LENGTH = struct.Struct('<Q')
+
+# (column name, array typecode)
+Schema = Sequence[Tuple[str, str]]
+
+def _to_bytes(values: array) -> bytes:
+    """Serialize an array as little-endian bytes."""
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def _from_bytes(typecode: str, data: bytes) -> array:
+    """Deserialize little-endian bytes into an array."""
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+class ColumnarWriter:
+    """Writes rows to a columnar file in fixed-size batches."""
+
+    def __init__(self, file_path: str, schema: Schema, batch_size: int = 65536, level: int = 6):
+        """
+        Initialize the writer.
+
+        Args:
+            file_path: File to create
+            schema: Column names and array typecodes
+            batch_size: Rows buffered before a batch is compressed and written
+            level: zlib compression level
+        """
+        self.file_path = file_path
+        self.schema = list(schema)
+        self.batch_size = batch_size
+        self.level = level
+        self.dictionaries: Dict[str, List[str]] = {}
+        self.rows = 0
+        self._columns = self._empty_batch()
+        self._batches: List[Dict] = []
+        self._file = open(file_path, 'wb')
+        self._file.write(MAGIC)
+
+    def _empty_batch(self) -> Dict[str, array]:
+        return {name: array(typecode) for name, typecode in self.schema}
+
+    @property
+    def columns(self) -> Dict[str, array]:
+        """Arrays of the batch being filled, for appending values directly."""
+        return self._columns
+
+    def row_added(self):
+        """Count a row appended to ``columns`` and flush full batches."""
+        self.rows += 1
+        if len(self._columns[self.schema[0][0]]) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Compress and write the current batch."""
+        rows = len(self._columns[self.schema[0][0]])
+        if not rows:
+            return
+        blocks = {}
+        for name, _ in self.schema:
+            data = zlib.compress(_to_bytes(self._columns[name]), self.level)
+            blocks[name] = [self._file.tell(), len(data)]
+            self._file.write(data)
+        self._batches.append({'rows': rows, 'columns': blocks})
+        self._columns = self._empty_batch()
+
+    def close(self):
+        """Write the last batch and the footer."""
+        self.flush()
+        footer = json.dumps({
+            'schema': self.schema,
+            'rows': self.rows,
+            'batches': self._batches,
+            'dictionaries': self.dictionaries,
+        }).encode('utf-8')
+        self._file.write(footer)
+        self._file.write(_FOOTER_LENGTH.pack(len(footer)))
+        self._file.write(MAGIC)
+        self._file.close()
+
+    def __enter__(self) -> 'ColumnarWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+class ColumnarReader:
+    """Reads columns of a columnar file as arrays."""
+
+    def __init__(self, file_path: str):
+        """Open a file and read its footer."""
+        self.file_path = file_path
+        with open(file_path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{file_path} is not a columnar file")
+            f.seek(-(len(MAGIC) + _FOOTER_LENGTH.size), 2)
+            (footer_length,) = _FOOTER_LENGTH.unpack(f.read(_FOOTER_LENGTH.size))
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{file_path} is truncated")
+            f.seek(-(len(MAGIC) + _FOOTER_LENGTH.size + footer_length), 2)
+            footer = json.loads(f.read(footer_length))
+
+        self.schema: Dict[str, str] = {name: typecode for name, typecode in footer['schema']}
+        self.rows: int = footer['rows']
+        self.dictionaries: Dict[str, List[str]] = footer['dictionaries']
+        self._batches: List[Dict] = footer['batches']
+
+    def iter_batches(self, columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, array]]:
+        """Yield each batch as a dict of arrays, reading only the requested columns."""
+        columns = list(columns or self.schema)
+        unknown = [name for name in columns if name not in self.schema]
+        if unknown:
+            raise KeyError(f"Unknown columns: {', '.join(unknown)}")
+
+        with open(self.file_path, 'rb') as f:
+            for batch in self._batches:
+                result = {}
+                for name in columns:
+                    offset, length = batch['columns'][name]
+                    f.seek(offset)
+                    result[name] = _from_bytes(self.schema[name], zlib.decompress(f.read(length)))
+                yield result
+
+    def read_columns(self, columns: Optional[Sequence[str]] = None) -> Dict[str, array]:
+        """Read whole columns, concatenating every batch."""
+        columns = list(columns or self.schema)
+        result = {name: array(self.schema[name]) for name in columns}
+        for batch in self.iter_batches(columns):
+            for name in columns:
+                result[name].extend(batch[name])
+        return result
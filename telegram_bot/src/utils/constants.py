@@ -18,7 +18,7 @@ class TimeFormat(Enum):
     DATETIME = "%Y-%m-%d %I:%M %p"
 
 # Logging constants
-LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(tenant)s%(message)s"
 LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 LOG_FILE = "bot.log"
 MAX_LOG_SIZE = 5 * 1024 * 1024  # 5MB
@@ -29,10 +29,24 @@ MAX_MESSAGE_LENGTH = 4096  # Telegram's max message length
 DEFAULT_TIMEZONE = "UTC"
 WEEKLY_PROMPT_DAY = 0  # Monday
 WEEKLY_PROMPT_HOUR = 9  # 9 AM
+BROADCAST_MESSAGES_PER_SECOND = 25  # Stay below Telegram's ~30 messages/second limit
+BROADCAST_MAX_RETRIES = 3
 
 # Storage constants
 DEFAULT_USERS_FILE = "data/users.json"
 DEFAULT_MAX_HISTORY = 5
+USER_PAGE_SIZE = 500  # Users fetched per page when iterating storage
+USER_CACHE_FLUSH_INTERVAL = 30  # Seconds between write-backs of changed cached users
+DEFAULT_BLOB_DIR = "data/blobs"
+BLOB_CHUNK_SIZE = 64 * 1024  # 64KB per chunk when downloading media
+USER_FILE_CHUNK_SIZE = 1024 * 1024  # Characters read at a time when streaming users
+MAX_USER_RECORD_SIZE = 64 * 1024 * 1024  # Larger user records are treated as corrupt
+
+# Import constants
+IMPORT_BATCH_SIZE = 10000  # Imported entries committed per storage write
+IMPORT_MAX_FILE_SIZE = 20 * 1024 * 1024  # Bot API download limit
+IMPORT_MAX_RESPONSE_LENGTH = 20000
+IMPORT_MAX_ROW_SIZE = 1024 * 1024  # Larger JSON array items are treated as corrupt
 
 # Error messages
 ERROR_MESSAGES = {
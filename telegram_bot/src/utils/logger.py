@@ -1,5 +1,6 @@
 """Logging configuration for the Telegram Journal Bot."""
 
+import contextvars
 import logging
 import logging.handlers
 import os
@@ -14,6 +15,29 @@ from .constants import (
     LogLevel
 )
 
+# Tenant whose bot is running in the current context, see set_log_tenant
+_tenant: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('log_tenant', default=None)
+
+class TenantFilter(logging.Filter):
+    """Adds the tenant of the current context to records as ``tenant``."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        tenant = _tenant.get()
+        record.tenant = f"[{tenant}] " if tenant else ''
+        return True
+
+def set_log_tenant(name: Optional[str]):
+    """
+    Tag log records from the current context with a tenant name.
+
+    Tasks and threads started afterwards copy the context, so everything a
+    tenant's application runs is tagged.
+
+    Args:
+        name: Tenant name, None to stop tagging
+    """
+    _tenant.set(name)
+
 def setup_logging(
     log_level: LogLevel = LogLevel.INFO,
     log_file: Optional[str] = None,
@@ -45,10 +69,12 @@ def setup_logging(
         backupCount=BACKUP_COUNT
     )
     file_handler.setFormatter(formatter)
+    file_handler.addFilter(TenantFilter())
 
     # Configure console handler
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
+    console_handler.addFilter(TenantFilter())
 
     # Get root logger and configure it
     root_logger = logging.getLogger()
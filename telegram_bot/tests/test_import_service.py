@@ -0,0 +1,33 @@
+"""Tests for reporting invalid rows of imported files."""
+
+from src.services.import_service import iter_import_rows, parse_import_entry
+
+def _errors(path):
+    errors = []
+    for location, row in iter_import_rows(str(path)):
+        try:
+            parse_import_entry(row)
+        except ValueError as e:
+            errors.append(f"{location}: {e}")
+    return errors
+
+def test_invalid_json_line_is_reported_as_invalid_json(tmp_path):
+    path = tmp_path / 'entries.jsonl'
+    path.write_text('{bad\n{"response": "ok", "timestamp": "2024-01-01T00:00:00"}\n', encoding='utf-8')
+    errors = _errors(path)
+    assert len(errors) == 1
+    assert errors[0].startswith("line 1: invalid JSON")
+
+def test_oversized_csv_field_skips_only_its_row(tmp_path):
+    path = tmp_path / 'entries.csv'
+    path.write_text(
+        'response,timestamp\n'
+        f'"{"x" * 200000}",2024-01-01T00:00:00\n'
+        'ok,2024-01-02T00:00:00\n',
+        encoding='utf-8'
+    )
+    rows = list(iter_import_rows(str(path)))
+    assert len(rows) == 2
+    assert rows[0][0] == "line 2"
+    assert rows[0][1]['__error__'].startswith("invalid CSV")
+    assert parse_import_entry(rows[1][1]).response == 'ok'
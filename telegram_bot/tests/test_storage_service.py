@@ -0,0 +1,13 @@
+"""Tests for the cached storage of users."""
+
+from src.models.user import User
+from src.services.storage_service import StorageService
+
+def test_scanned_user_is_the_object_get_user_returns(tmp_path):
+    storage = StorageService(str(tmp_path / 'users.db'), cache_size=2)
+    storage.add_users([User(id=str(i)) for i in range(10)])
+
+    user = next(iter(storage.iter_users()))
+    assert user is storage.get_user(user.id)
+    users = storage.get_all_users()
+    assert users['5'] is storage.get_user('5')
@@ -0,0 +1,40 @@
+"""Tests for reading damaged users files."""
+
+import json
+import os
+from src.services.storage_service import StorageService
+from src.services.user_files import LegacyJsonUserFile
+
+def _write_users(path, count):
+    users = {str(i): {'responses': [], 'last_prompt': None} for i in range(count)}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(users, f, indent=2)
+
+def test_stray_closing_brace_does_not_drop_later_users(tmp_path):
+    path = str(tmp_path / 'users.json')
+    _write_users(path, 5)
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    # Turn the separator before user "2" into a closing brace
+    index = text.index('\n  "2"') - 1
+    assert text[index] == ','
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text[:index] + '}' + text[index + 1:])
+
+    user_file = LegacyJsonUserFile(path, chunk_size=16)
+    assert [user_id for user_id, _ in user_file.iter_records()] == ['0', '1', '2', '3', '4']
+    assert len(user_file.errors) == 1
+
+    storage = StorageService(path)
+    assert sorted(storage.users) == ['0', '1', '2', '3', '4']
+    assert os.path.exists(f"{path}.corrupt")
+
+def test_trailing_whitespace_is_not_an_error(tmp_path):
+    path = str(tmp_path / 'users.json')
+    _write_users(path, 3)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('\n\n  ')
+
+    user_file = LegacyJsonUserFile(path, chunk_size=16)
+    assert [user_id for user_id, _ in user_file.iter_records()] == ['0', '1', '2']
+    assert user_file.errors == []